@@ -0,0 +1,3 @@
+"""
+Benchmarks for fosslint, run using `python -m bench`.
+"""
@@ -0,0 +1,124 @@
+import os
+import random
+
+from fosslint.licenses import load_license_header
+
+ENTITY = 'Bench Entity'
+YEAR = '2016'
+
+# comment syntax by extension.
+LANGUAGES = {
+    'py': ('#', None, None),
+    'java': (' *', '/*', ' */'),
+    'c': (' *', '/*', ' */'),
+}
+
+CONFIG = """[global]
+entity = {entity}
+year = {year}
+
+[pattern:/**/*.py]
+license_header = Apache 2.0
+
+[pattern:/**/*.java]
+license_header = Apache 2.0
+
+[pattern:/**/*.c]
+license_header = Apache 2.0
+
+[ignore:/vendor*/**]
+"""
+
+
+class Params:
+    """
+    Parameters of a synthetic project.
+    """
+
+    def __init__(self, files=1000, depth=4, fanout=4, languages=None,
+                 correct=0.9, size=4096, ignored_dirs=2, ignored_files=1000,
+                 seed=0):
+        self.files = files
+        self.depth = depth
+        self.fanout = fanout
+        self.languages = languages or sorted(LANGUAGES.keys())
+        self.correct = correct
+        self.size = size
+        self.ignored_dirs = ignored_dirs
+        self.ignored_files = ignored_files
+        self.seed = seed
+
+    def to_dict(self):
+        return dict(self.__dict__)
+
+
+def render_header(language, entity):
+    prefix, start, end = LANGUAGES[language]
+    header = load_license_header('Apache 2.0')
+    lines = []
+
+    if start is not None:
+        lines.append(start)
+
+    for line in header.render(entity=entity, year=YEAR):
+        lines.append(prefix + ' ' + line)
+
+    if end is not None:
+        lines.append(end)
+
+    return u''.join(l + u'\n' for l in lines)
+
+
+def random_directory(rng, params):
+    depth = rng.randint(0, params.depth)
+    parts = ['d{}'.format(rng.randrange(params.fanout)) for _ in range(depth)]
+    return '/'.join(parts)
+
+
+def body(rng, size):
+    line = u'x = {}\n'.format('y' * 60)
+    return line * max(1, rng.randint(size // 2, size * 3 // 2) // len(line))
+
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, 'w') as f:
+        f.write(content)
+
+
+def generate(root, params):
+    """
+    Generate a reproducible synthetic project in root.
+
+    Returns the number of files generated which should be checked.
+    """
+
+    rng = random.Random(params.seed)
+    headers = {}
+
+    for language in params.languages:
+        headers[language] = (
+            render_header(language, ENTITY),
+            render_header(language, 'Wrong Entity'))
+
+    with open(os.path.join(root, '.fosslint'), 'w') as f:
+        f.write(CONFIG.format(entity=ENTITY, year=YEAR))
+
+    for i in range(params.files):
+        language = rng.choice(params.languages)
+        directory = random_directory(rng, params)
+        path = os.path.join(root, 'src', directory, 'f{}.{}'.format(
+            i, language))
+
+        correct, wrong = headers[language]
+        header = correct if rng.random() < params.correct else wrong
+        write(path, header + body(rng, params.size))
+
+    for i in range(params.ignored_files):
+        directory = 'vendor{}'.format(i % max(1, params.ignored_dirs))
+        path = os.path.join(
+            root, directory, random_directory(rng, params), 'v{}.py'.format(i))
+        write(path, body(rng, params.size))
+
+    return params.files
@@ -0,0 +1,249 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from fosslint.project import load_project
+from fosslint.walker import Walker
+
+from .generate import Params
+from .generate import generate
+
+# a stage is a regression if it is this much slower than the baseline.
+REGRESSION_THRESHOLD = 1.2
+
+
+def bytes_read():
+    """
+    Number of bytes read by this process so far, if available.
+    """
+
+    try:
+        with open('/proc/self/io') as f:
+            for line in f:
+                if line.startswith('rchar:'):
+                    return int(line.split(':', 1)[1])
+    except OSError:
+        pass
+
+    return None
+
+
+class Stage:
+    """
+    Measures a single stage of a run.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.wall = None
+        self.items = None
+        self.bytes_read = None
+        self.peak_memory = None
+        # memory still allocated at the end of the stage, like the results
+        # of the stage.
+        self.retained_memory = None
+
+    def __enter__(self):
+        tracemalloc.reset_peak()
+        self._memory, _ = tracemalloc.get_traced_memory()
+        self._bytes_read = bytes_read()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self.wall = time.perf_counter() - self._start
+        current, self.peak_memory = tracemalloc.get_traced_memory()
+        self.retained_memory = current - self._memory
+
+        end = bytes_read()
+
+        if end is not None and self._bytes_read is not None:
+            self.bytes_read = end - self._bytes_read
+
+    def to_dict(self):
+        per_second = None
+
+        if self.items is not None and self.wall:
+            per_second = self.items / self.wall
+
+        return {
+            "wall": self.wall,
+            "items": self.items,
+            "items_per_second": per_second,
+            "bytes_read": self.bytes_read,
+            "peak_memory": self.peak_memory,
+            "retained_memory": self.retained_memory,
+        }
+
+
+def run_stages(root):
+    """
+    Run every stage of fosslint over the project in root.
+    """
+
+    stages = []
+
+    with open(os.devnull, 'w') as devnull:
+        project = load_project(root, devnull)
+
+    context = project.context
+
+    with Stage('walk') as stage:
+        files = list(Walker(root, project.pruned).walk())
+        stage.items = len(files)
+
+    stages.append(stage)
+
+    with Stage('match') as stage:
+        opts = list(project.match_files(files))
+        stage.items = len(files)
+
+    stages.append(stage)
+
+    with Stage('check') as stage:
+        results = [(opt, opt.check(context)) for opt in opts]
+        stage.items = len(opts)
+
+    stages.append(stage)
+
+    with Stage('bind') as stage:
+        violations = [
+            opt.bind(context, r) for opt, records in results for r in records]
+        stage.items = len(violations)
+
+    stages.append(stage)
+
+    with Stage('diff') as stage:
+        for e in violations:
+            for _ in e.diff(context):
+                pass
+
+        stage.items = len(violations)
+
+    stages.append(stage)
+
+    with Stage('fix') as stage:
+        for e in violations:
+            e.fix(context)
+
+        stage.items = len(violations)
+
+    stages.append(stage)
+    return stages
+
+
+def compare(results, baseline):
+    """
+    Compare results against a baseline, returning the names of all stages
+    which have regressed.
+    """
+
+    regressions = []
+
+    for name, stage in results['stages'].items():
+        before = baseline.get('stages', {}).get(name)
+
+        if before is None or not before['wall']:
+            continue
+
+        ratio = stage['wall'] / before['wall']
+        regressed = ratio > REGRESSION_THRESHOLD
+
+        print('{:8} {:8.3f}s -> {:8.3f}s ({:.2f}x){}'.format(
+            name, before['wall'], stage['wall'], ratio,
+            ' REGRESSION' if regressed else ''))
+
+        if regressed:
+            regressions.append(name)
+
+    return regressions
+
+
+def setup_parser():
+    parser = argparse.ArgumentParser(prog='python -m bench')
+    defaults = Params()
+
+    parser.add_argument('--files', type=int, default=defaults.files)
+    parser.add_argument('--depth', type=int, default=defaults.depth)
+    parser.add_argument('--fanout', type=int, default=defaults.fanout)
+    parser.add_argument(
+        '--languages', default=','.join(defaults.languages),
+        help="Comma separated list of languages to generate")
+    parser.add_argument(
+        '--correct', type=float, default=defaults.correct,
+        help="Ratio of files with a correct header")
+    parser.add_argument(
+        '--size', type=int, default=defaults.size,
+        help="Average size of generated files in bytes")
+    parser.add_argument(
+        '--ignored-dirs', dest='ignored_dirs', type=int,
+        default=defaults.ignored_dirs)
+    parser.add_argument(
+        '--ignored-files', dest='ignored_files', type=int,
+        default=defaults.ignored_files)
+    parser.add_argument('--seed', type=int, default=defaults.seed)
+    parser.add_argument(
+        '--save', metavar="<file>",
+        help="Save the results as a JSON baseline")
+    parser.add_argument(
+        '--baseline', metavar="<file>",
+        help="Compare the results against a previously saved baseline")
+
+    return parser
+
+
+def main(args=None):
+    ns = setup_parser().parse_args(args)
+
+    params = Params(
+        files=ns.files,
+        depth=ns.depth,
+        fanout=ns.fanout,
+        languages=ns.languages.split(','),
+        correct=ns.correct,
+        size=ns.size,
+        ignored_dirs=ns.ignored_dirs,
+        ignored_files=ns.ignored_files,
+        seed=ns.seed)
+
+    tracemalloc.start()
+
+    with tempfile.TemporaryDirectory() as root:
+        generate(root, params)
+        stages = run_stages(root)
+
+    tracemalloc.stop()
+
+    results = {
+        "params": params.to_dict(),
+        "stages": dict((s.name, s.to_dict()) for s in stages),
+    }
+
+    for s in stages:
+        d = s.to_dict()
+
+        print('{:8} {:8.3f}s {:>10} items {:>12} items/s {:>12} bytes read '
+              '{:>12} peak bytes {:>12} retained bytes'.format(
+                  s.name, s.wall, s.items,
+                  int(d['items_per_second'] or 0),
+                  s.bytes_read if s.bytes_read is not None else '-',
+                  s.peak_memory, s.retained_memory))
+
+    if ns.save:
+        with open(ns.save, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if ns.baseline:
+        with open(ns.baseline) as f:
+            baseline = json.load(f)
+
+        if baseline.get('params') != results['params']:
+            print('Warning: baseline was generated with different parameters')
+
+        if compare(results, baseline):
+            return 1
+
+    return 0
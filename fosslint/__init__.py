@@ -1,19 +1,30 @@
 import os
 import argparse
-import configparser
 import sys
-
-from .config import Config
-from .pathglob import pathglob_compile
-from .policies import load_policy
-
-from .context import Context
-from .global_section import GlobalSection
-from .file_match_options import FileMatchOptions
-from .pattern_section import PatternSection
-
-ETC="/etc/fosslint.conf"
-DOTFILE=".fosslint"
+import time
+
+from .cache import CACHE_DIR
+from .cache import Cache
+from .config_cache import ConfigCache
+from .reporters import REPORTERS
+from .reporters import Summary
+from .reporters import load_reporter
+
+from .executor import EXECUTORS
+from .executor import check_files
+from .fixer import apply_fixes
+from .git import ChangedWalker
+from .git import BlobReader
+from .git import GitWalker
+from .git import StagedWalker
+from .project import DOTFILE
+from .project import ETC
+from .project import load_project
+from .stats import NullStats
+from .stats import Stats
+from .walker import PathWalker
+from .walker import Walker
+from .walker import iterate_files
 
 def init_action(ns):
     dotfile = os.path.join(ns.root, DOTFILE)
@@ -29,134 +40,259 @@ def init_action(ns):
 
 
 def check_action(ns):
-    home = os.path.join(os.path.expanduser('~'), DOTFILE)
-    configs = [ETC, home, os.path.join(ns.root, DOTFILE)]
+    # paths are relative to the current directory, and the server might not
+    # share it.
+    ns.paths = [os.path.abspath(p) for p in ns.paths]
 
-    config_parser = configparser.RawConfigParser()
+    if ns.socket is not None and not (
+            ns.fix or ns.stats or ns.profile or ns.staged):
+        from .client import check_remote
 
-    for c in configs:
-        if not os.path.isfile(c):
-            continue
+        log = sys.stdout if ns.format == 'text' else sys.stderr
+        result = check_remote(ns, load_reporter(ns.format), log, ns.paths)
 
-        config_parser.read(c)
+        if result is not None:
+            return result
 
-    config = Config(config_parser)
+    if ns.profile is None:
+        return run_check(ns)
 
-    # patterns to ignore
-    ignored = []
-    # patterns to evalute
-    patterns = []
-    # context for local configurations
-    context = Context(ns.root)
-    # global configuration
-    global_section = GlobalSection(context)
+    import cProfile
 
-    for section in config.sections():
-        if section.startswith('policy:'):
-            _, name = section.split(':', 1)
-            section = config[section]
-            policy = load_policy(name, section)
-            print('Applying Policy: ' + policy.name)
-            policy.apply(context, global_section, patterns)
-            continue
+    profiler = cProfile.Profile()
 
-    for section in config.sections():
-        if section.startswith('policy:'):
-            # already applied
-            continue
+    try:
+        return profiler.runcall(run_check, ns)
+    finally:
+        profiler.dump_stats(ns.profile)
 
-        if section == 'global':
-            global_section.parse_section(config[section])
-            continue
 
-        if section.startswith('ignore:'):
-            _, rest = section.split(':', 1)
-            ignored.append(pathglob_compile(rest))
-            continue
+def watch_action(ns):
+    if ns.format != 'text':
+        raise Exception('Watching only supports --format text')
 
-        if section.startswith('pattern:'):
-            patterns.append(
-                PatternSection.parse(context, section, config[section]))
-            continue
+    if ns.fix:
+        raise Exception('--fix is not supported when watching')
 
-        raise Exception('Unsupported section (' + section + ')')
+    # only supported on linux
+    from .watch import watch
+    return watch(ns, load_reporter(ns.format), sys.stdout)
 
-    global_section.verify()
 
-    checks_by_file = dict()
+def serve_action(ns):
+    if ns.socket is None:
+        raise Exception('--socket is required to serve')
 
-    checks = []
+    from .server import serve
+    return serve(ns, sys.stdout)
 
-    for (path, relative) in iterate_files(ns.root):
-        # is the file ignored
-        if any(ign(relative) for ign in ignored):
-            continue
 
-        for s in patterns:
-            if not s.pattern(relative):
-                continue
+def run_check(ns):
+    start = time.monotonic()
 
-            try:
-                opt = checks_by_file[relative]
-            except KeyError:
-                opt = checks_by_file[relative] = FileMatchOptions(
-                    global_section, relative, path)
+    if ns.fix and ns.format != 'text':
+        raise Exception('--fix is only supported with --format text')
 
-            opt.load_section(s)
+    if ns.fix and ns.staged:
+        raise Exception('--fix is not supported with --staged')
 
-    for relative, opt in sorted(checks_by_file.items(), key=lambda e: e[0]):
-        if ns.verbose:
-            print('Checking: ' + relative)
+    reporter = load_reporter(ns.format)
+    # informational messages must not interfere with machine readable output
+    log = sys.stdout if ns.format == 'text' else sys.stderr
 
-        checks.append((opt, opt.evaluate(context)))
+    stats = Stats() if ns.stats else NullStats()
 
-    if all(len(e) == 0 for p, e in checks):
-        print("Performed {} check(s), no issues found :)".format(len(checks)))
-        return 0
+    config_cache = None
+
+    if not ns.no_cache:
+        config_cache = ConfigCache.for_root(ns.root)
+
+    with stats.phase('config'):
+        project = load_project(ns.root, log, stats, config_cache)
+
+    context = project.context
+
+    if ns.staged:
+        walker = StagedWalker(ns.root)
+        context.blobs = BlobReader(ns.root)
+    elif ns.paths:
+        walker = PathWalker(ns.root, ns.paths, project.pruned)
+    elif ns.since is not None:
+        walker = ChangedWalker(ns.root, ns.since)
+    elif ns.source == 'git':
+        walker = GitWalker(ns.root)
+    else:
+        walker = Walker(ns.root, project.pruned)
+
+    cache = None
+
+    # the cache is keyed on the working tree, not the index.
+    if not ns.no_cache and not ns.staged:
+        cache = Cache.open(os.path.join(ns.root, CACHE_DIR))
+
+    max_violations = ns.max_violations
+
+    if ns.fail_fast:
+        max_violations = 1
+
+    files = stats.timed('walk', walker.walk())
+    opts = stats.timed('match', project.match_files(files))
+
+    checks = check_files(context, opts, ns.jobs, ns.executor, cache)
+
+    count = 0
+    violations = 0
+    by_kind = dict()
+    # fixes which has been accepted with --yes, applied once checking is done
+    pending_fixes = []
+
+    reporter.start()
+
+    try:
+        for opt, records in stats.timed('check', checks):
+            if ns.verbose:
+                print('Checking: ' + opt.relative, file=log)
+
+            count += 1
+
+            with stats.phase('report'):
+                for e in (opt.bind(context, r) for r in records):
+                    violations += 1
+                    by_kind[e.kind] = by_kind.get(e.kind, 0) + 1
+                    stats.count('violations: ' + e.kind)
+                    reporter.violation(opt, e)
+
+                    if ns.fix:
+                        fix_violation(ns, context, e, pending_fixes)
+
+            if max_violations is not None and violations >= max_violations:
+                print("Stopping after {} violation(s)".format(violations),
+                      file=log)
+                break
+
+        complete = walker.complete and (
+            max_violations is None or violations < max_violations)
+
+        reporter.finish(Summary(
+            checks=count,
+            violations=violations,
+            by_kind=by_kind,
+            elapsed=time.monotonic() - start,
+            complete=complete))
+    finally:
+        checks.close()
+
+        if context.blobs is not None:
+            context.blobs.close()
 
-    for (opt, errors) in checks:
-        for e in errors:
-            print("{}:{} - {}:".format(e.path, e.line, e.kind))
-            print("  {}".format(e.message))
+        # completes the report, if the check was aborted.
+        reporter.close()
 
-            if ns.fix:
-                if e.diff:
-                    for line in e.diff():
-                        sys.stdout.write(line)
+    if len(pending_fixes) > 0:
+        with stats.phase('fix'):
+            apply_pending_fixes(ns, context, pending_fixes)
 
-                if ns.yes or wait_for_yes(e.describe_fix()):
-                    print("Fixing: {}".format(e.path))
-                    e.fix()
-                else:
-                    print("NOT fixing: {}".format(e.path))
+    if cache is not None:
+        cache.save(complete=complete, log=log)
+
+        if ns.verbose:
+            print('Cache: {} hit(s), {} miss(es)'.format(
+                cache.hits, cache.misses), file=log)
+
+    # headers rendered during the check are cached as well.
+    if config_cache is not None and (
+            not config_cache.loaded or context.headers.misses > 0):
+        config_cache.save(project, log)
+
+    if ns.verbose:
+        print('Pruned {} ignored directories'.format(walker.pruned),
+              file=log)
+        print('Rendered headers: {} hit(s), {} miss(es)'.format(
+            context.headers.hits, context.headers.misses), file=log)
+
+    if stats.enabled:
+        stats.count('dirs visited', getattr(walker, 'dirs', 0))
+        stats.count('dirs pruned', walker.pruned)
+        stats.count('files checked', count)
+        stats.report(log)
+
+    if violations == 0:
+        return 0
 
     return 1
 
 
-def setup_parser():
-    parser = argparse.ArgumentParser()
+def fix_violation(ns, context, e, pending_fixes):
+    if not e.fixable:
+        return
+
+    for line in e.diff(context):
+        sys.stdout.write(line)
+
+    if ns.yes:
+        pending_fixes.append(e)
+        return
+
+    if wait_for_yes(e.describe_fix()):
+        print("Fixing: {}".format(e.path))
+        e.fix(context)
+    else:
+        print("NOT fixing: {}".format(e.path))
+
+
+def apply_pending_fixes(ns, context, pending_fixes):
+    fixed = 0
+    failed = 0
+
+    for report in apply_fixes(context, pending_fixes, ns.jobs):
+        if report.ok:
+            fixed += 1
+            print("Fixed: {}".format(report.path))
+        else:
+            failed += 1
+            print("Failed to fix: {}: {}".format(report.path, report.error))
+
+    print("Fixed {} file(s), {} failed".format(fixed, failed))
+
+
+def positive_int(value):
+    n = int(value)
+
+    if n < 1:
+        raise argparse.ArgumentTypeError('must be at least 1: ' + value)
+
+    return n
+
+
+def setup_options(defaults):
+    """
+    Options shared by the top-level parser and the check action.
+
+    Defaults are only set for the top-level parser, so that options given
+    before the action are not reset by it.
+    """
+
+    parser = argparse.ArgumentParser(
+        add_help=False, argument_default=argparse.SUPPRESS)
 
     parser.add_argument(
         '--root',
         metavar="<dir>",
-        help="Directory to process",
-        default=os.getcwd()
+        help="Directory to process"
     )
 
     parser.add_argument(
         '--fix',
         help="Fix found problems",
         action="store_const",
-        const=True,
-        default=False
+        const=True
     )
 
     parser.add_argument(
         '--yes',
         help="Automatically answer yes when asked to apply a fix",
         action="store_const",
-        const=True,
-        default=False
+        const=True
     )
 
     parser.add_argument(
@@ -164,10 +300,121 @@ def setup_parser():
         dest='verbose',
         help="Increase verbosity",
         action="store_const",
-        const=True,
-        default=False
+        const=True
+    )
+
+    parser.add_argument(
+        '-j', '--jobs',
+        metavar="<n>",
+        help="Number of files to check in parallel (0 = one per CPU)",
+        type=int
     )
 
+    parser.add_argument(
+        '--executor',
+        help="Kind of worker pool to use when --jobs is more than one",
+        choices=sorted(EXECUTORS.keys())
+    )
+
+    parser.add_argument(
+        '--source',
+        help="Where to find files to check, either by walking the file "
+             "system or the files tracked in git (default: walk)",
+        choices=['walk', 'git']
+    )
+
+    parser.add_argument(
+        '--no-cache',
+        dest='no_cache',
+        help="Do not use or update the cache of previous results (stored in "
+             + CACHE_DIR + ")",
+        action="store_const",
+        const=True
+    )
+
+    parser.add_argument(
+        '--format',
+        help="Format to report violations in (default: text)",
+        choices=sorted(REPORTERS.keys())
+    )
+
+    parser.add_argument(
+        '--fail-fast',
+        dest='fail_fast',
+        help="Stop at the first violation found",
+        action="store_const",
+        const=True
+    )
+
+    parser.add_argument(
+        '--max-violations',
+        dest='max_violations',
+        metavar="<n>",
+        help="Stop after the given number of violations have been found",
+        type=positive_int
+    )
+
+    parser.add_argument(
+        '--stats',
+        help="Print time spent in each phase, counters and the slowest files",
+        action="store_const",
+        const=True
+    )
+
+    parser.add_argument(
+        '--profile',
+        metavar="<file>",
+        help="Profile the run using cProfile, writing the result to <file>"
+    )
+
+    parser.add_argument(
+        '--since',
+        metavar="<rev>",
+        help="Only check files added, modified or renamed since the given "
+             "git revision, including uncommitted changes"
+    )
+
+    parser.add_argument(
+        '--staged',
+        help="Only check files which are staged in git, using their staged "
+             "content rather than what's in the working tree",
+        action="store_const",
+        const=True
+    )
+
+    parser.add_argument(
+        '--socket',
+        metavar="<path>",
+        help="Unix socket of a server started with `fosslint serve`, checks "
+             "are sent to the server if it is running"
+    )
+
+    if defaults:
+        parser.set_defaults(
+            root=os.getcwd(),
+            fix=False,
+            yes=False,
+            verbose=False,
+            jobs=1,
+            executor='thread',
+            source='walk',
+            no_cache=False,
+            format='text',
+            fail_fast=False,
+            max_violations=None,
+            stats=False,
+            profile=None,
+            since=None,
+            staged=False,
+            socket=None,
+            paths=[]
+        )
+
+    return parser
+
+
+def setup_parser():
+    parser = argparse.ArgumentParser(parents=[setup_options(True)])
     parser.set_defaults(action=check_action)
 
     subparsers = parser.add_subparsers(
@@ -176,9 +423,28 @@ def setup_parser():
     )
 
     check = subparsers.add_parser(
-        'check', help="Check for violations in a project")
+        'check', help="Check for violations in a project",
+        parents=[setup_options(False)])
+    check.add_argument(
+        'paths',
+        metavar="<path>",
+        nargs='*',
+        help="Only check the given files and directories"
+    )
     check.set_defaults(action=check_action)
 
+    serve = subparsers.add_parser(
+        'serve', help="Keep the configuration of a project loaded, and "
+                      "answer checks over a Unix socket given by --socket",
+        parents=[setup_options(False)])
+    serve.set_defaults(action=serve_action)
+
+    watch = subparsers.add_parser(
+        'watch', help="Check a project, then keep checking files as they "
+                      "change (Linux only)",
+        parents=[setup_options(False)])
+    watch.set_defaults(action=watch_action)
+
     init = subparsers.add_parser(
         'init', help="Initialize a project with a default configuration")
     init.set_defaults(action=init_action)
@@ -186,22 +452,6 @@ def setup_parser():
     return parser
 
 
-def iterate_files(root):
-    queue = [(root, '')]
-
-    while len(queue) > 0:
-        (path, rel) = queue.pop()
-
-        for name in os.listdir(path):
-            next_path = os.path.join(path, name)
-            next_relative = '/'.join([rel, name])
-
-            if os.path.isdir(next_path):
-                queue.append((next_path, next_relative))
-            else:
-                yield (next_path, next_relative)
-
-
 def wait_for_yes(message):
     while True:
         line = input(message + ' [y/n]? ')
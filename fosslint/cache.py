@@ -0,0 +1,230 @@
+import json
+import os
+import sys
+import time
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from .violation import ViolationRecord
+
+CACHE_DIR = ".fosslint-cache"
+CACHE_FILE = "cache.json"
+LOCK_FILE = "lock"
+# bump when the format of the cache or the result of a check changes.
+CACHE_VERSION = 3
+# maximum number of entries kept in the cache.
+MAX_ENTRIES = 500000
+
+
+def stat_key(path):
+    """
+    Build the part of a cache key that identifies the content of a file.
+    """
+
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size, st.st_ino]
+
+
+def encode_record(record):
+    return [record.line, record.kind, record.message,
+            list(record.range_index) if record.range_index else None,
+            record.expected, record.actual]
+
+
+def decode_record(path, data):
+    line, kind, message, range_index, expected, actual = data
+
+    return ViolationRecord(
+        path=path,
+        line=line,
+        kind=kind,
+        message=message,
+        range_index=tuple(range_index) if range_index else None,
+        expected=expected,
+        actual=actual
+    )
+
+
+class Cache:
+    """
+    On-disk cache of check results.
+
+    Entries are keyed on the relative path of a file, and are only used if the
+    stat of the file and the fingerprint of its options are unchanged.
+
+    Saving merges with whatever is currently on disk while holding a lock, so
+    that parallel invocations sharing a cache don't lose each others results.
+    """
+
+    def __init__(self, directory, max_entries=MAX_ENTRIES):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.entries = dict()
+        # entries added or refreshed during this run
+        self.updated = dict()
+        # relative paths looked up during this run
+        self.seen = set()
+        # state of files which has been looked up but not yet stored
+        self.pending = dict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, CACHE_FILE)
+
+    @classmethod
+    def open(cls, directory, **kw):
+        cache = cls(directory, **kw)
+        cache.entries = cache.read()
+        return cache
+
+    def read(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return dict()
+
+        if not isinstance(data, dict) or data.get('version') != CACHE_VERSION:
+            return dict()
+
+        return data.get('entries', dict())
+
+    def state(self, opt, fingerprint):
+        """
+        Get the current state of the file of the given options, which must be
+        passed to get and put.
+        """
+
+        return [stat_key(opt.path), fingerprint]
+
+    def get(self, opt, state):
+        """
+        Get cached records for the given options, or None if they are missing
+        or stale.
+        """
+
+        self.seen.add(opt.relative)
+
+        entry = self.entries.get(opt.relative)
+
+        if entry is None or entry['state'] != state:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return [decode_record(opt.path, r) for r in entry['records']]
+
+    def put(self, opt, state, records):
+        entry = {
+            'state': state,
+            'checked': time.time(),
+            'records': [encode_record(r) for r in records],
+        }
+
+        self.seen.add(opt.relative)
+        self.entries[opt.relative] = entry
+        self.updated[opt.relative] = entry
+
+    def lookup(self, context, opt):
+        """
+        Look up cached records for the given options, remembering the state
+        of the file so that the result can be stored once it's been checked.
+        """
+
+        try:
+            state = self.state(opt, opt.fingerprint(context))
+        except OSError:
+            # the file is checked, and reported as unreadable, without being
+            # cached.
+            return None
+
+        records = self.get(opt, state)
+
+        if records is None:
+            self.pending[opt.relative] = state
+
+        return records
+
+    def store(self, opt, records):
+        """
+        Store the result of a file which was previously looked up.
+        """
+
+        state = self.pending.pop(opt.relative, None)
+
+        if state is not None:
+            self.put(opt, state, records)
+
+    def save(self, complete=True, log=sys.stderr):
+        """
+        Save the cache to disk, returning True if it was saved.
+
+        If complete is True, this run has seen every file in the project, and
+        entries for any files which were not seen (since they have been
+        deleted, or no longer match a pattern) are evicted.
+
+        The results of a check don't depend on the cache being saved, so if
+        it can't be (like in a read-only checkout) a warning is printed to
+        log instead of failing.
+        """
+
+        try:
+            self.merge(complete)
+        except OSError as e:
+            print('Failed to save cache: {}'.format(e), file=log)
+            return False
+
+        return True
+
+    def merge(self, complete):
+        """
+        Merge the entries of this run with the cache on disk, see save.
+        """
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        with open(os.path.join(self.directory, LOCK_FILE), 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+
+            entries = self.read()
+
+            for relative, entry in self.updated.items():
+                current = entries.get(relative)
+
+                if current is None or current['checked'] <= entry['checked']:
+                    entries[relative] = entry
+
+            if complete:
+                entries = dict(
+                    (k, v) for k, v in entries.items() if k in self.seen)
+
+            if len(entries) > self.max_entries:
+                ordered = sorted(
+                    entries.items(), key=lambda e: e[1]['checked'],
+                    reverse=True)
+                entries = dict(ordered[:self.max_entries])
+
+            self.write({'version': CACHE_VERSION, 'entries': entries})
+            self.entries = entries
+            self.updated = dict()
+            self.seen = set()
+
+    def write(self, data):
+        import tempfile
+
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix='.cache-')
+
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+
+            os.replace(tmp, self.path)
+        except:
+            os.unlink(tmp)
+            raise
@@ -0,0 +1,136 @@
+import json
+import os
+import socket
+import time
+
+from .reporters import Summary
+from .violation import Violation
+
+ENCODING = 'utf-8'
+
+
+class RemoteFile:
+    """
+    The options of a file checked by a server, as far as reporters are
+    concerned.
+    """
+
+    def __init__(self, relative):
+        self.relative = relative
+
+
+def connect(path):
+    """
+    Connect to the server at path, returning None if it isn't running.
+    """
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+
+    return sock
+
+
+def decode_violation(data):
+    return Violation(
+        path=data['path'],
+        line=data['line'],
+        kind=data['kind'],
+        message=data['message'],
+        expected=data['expected'],
+        actual=data['actual'],
+        offset=data['file_line'] - data['line'] - 1
+    )
+
+
+def check_remote(ns, reporter, log, paths=None):
+    """
+    Check a project through the server listening on ns.socket, reporting the
+    result through reporter.
+
+    Returns the exit code, or None if no server is running or if it can't
+    serve the request in which case the project should be checked in-process.
+    """
+
+    start = time.monotonic()
+    sock = connect(ns.socket)
+
+    if sock is None:
+        return None
+
+    request = {
+        "root": os.path.abspath(ns.root),
+        "since": ns.since,
+        "source": ns.source,
+        "jobs": ns.jobs,
+        "executor": ns.executor,
+        "no_cache": ns.no_cache,
+    }
+
+    if paths:
+        request['paths'] = paths
+
+    max_violations = 1 if ns.fail_fast else ns.max_violations
+    violations = 0
+    by_kind = dict()
+    started = False
+
+    try:
+        with sock:
+            sock.sendall(json.dumps(request).encode(ENCODING) + b'\n')
+            sock.shutdown(socket.SHUT_WR)
+
+            with sock.makefile('r', encoding=ENCODING) as f:
+                for line in f:
+                    data = json.loads(line)
+
+                    if data['type'] == 'error':
+                        if not started:
+                            print('Checking in-process, server failed: '
+                                  + data['message'], file=log)
+                            return None
+
+                        raise Exception('Server failed: ' + data['message'])
+
+                    if not started:
+                        reporter.start()
+                        started = True
+
+                    if data['type'] == 'violation':
+                        violations += 1
+                        kind = data['kind']
+                        by_kind[kind] = by_kind.get(kind, 0) + 1
+                        reporter.violation(
+                            RemoteFile(data['relative']),
+                            decode_violation(data))
+
+                        if (max_violations is not None
+                                and violations >= max_violations):
+                            print("Stopping after {} violation(s)".format(
+                                violations), file=log)
+
+                            reporter.finish(Summary(
+                                checks=None, violations=violations,
+                                by_kind=by_kind,
+                                elapsed=time.monotonic() - start,
+                                complete=False))
+                            return 1
+
+                    if data['type'] == 'summary':
+                        reporter.finish(Summary(
+                            checks=data['checks'],
+                            violations=data['violations'],
+                            by_kind=data['by_kind'],
+                            elapsed=time.monotonic() - start,
+                            complete=data['complete']))
+
+                        return 0 if data['violations'] == 0 else 1
+
+        raise Exception('Server closed the connection without a summary')
+    finally:
+        # completes the report, if the check was aborted.
+        reporter.close()
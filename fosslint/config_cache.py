@@ -0,0 +1,254 @@
+import copy
+import datetime
+import hashlib
+import os
+import pickle
+import stat
+import sys
+
+from .context import Context
+from .utils import file_digest
+
+CONFIG_CACHE_FILE = "config.pickle"
+# bump when anything that is pickled in the configuration cache changes.
+CONFIG_CACHE_VERSION = 4
+# packaged directories that configurations can load from, like licenses.
+PACKAGE_DIRS = ('licenses', 'policies')
+
+
+def package_state():
+    """
+    Identify the state of the packaged licenses and policies, so that
+    upgrading fosslint invalidates the configuration cache.
+    """
+
+    base = os.path.dirname(os.path.abspath(__file__))
+    state = []
+
+    for name in PACKAGE_DIRS:
+        with os.scandir(os.path.join(base, name)) as entries:
+            for entry in sorted(entries, key=lambda e: e.name):
+                if entry.is_file():
+                    st = entry.stat()
+                    state.append(
+                        [name + '/' + entry.name, st.st_mtime_ns, st.st_size])
+
+    return state
+
+
+class ProjectPickler(pickle.Pickler):
+    """
+    Pickles a project without its context and log, which belong to the
+    current invocation.
+    """
+
+    def __init__(self, f, context, log):
+        super().__init__(f, pickle.HIGHEST_PROTOCOL)
+        self.context = context
+        self.log = log
+
+    def persistent_id(self, obj):
+        if obj is self.context:
+            return 'context'
+
+        if obj is self.log:
+            return 'log'
+
+        return None
+
+
+class ProjectUnpickler(pickle.Unpickler):
+    def __init__(self, f, context, log):
+        super().__init__(f)
+        self.context = context
+        self.log = log
+
+    def persistent_load(self, pid):
+        if pid == 'context':
+            return self.context
+
+        if pid == 'log':
+            return self.log
+
+        raise pickle.UnpicklingError('Unsupported persistent id: ' + pid)
+
+
+class ConfigCache:
+    """
+    On-disk cache of a loaded configuration, including its pattern sections,
+    compiled matchers, loaded license texts and rendered headers.
+
+    The cache is keyed on the digest of every file the configuration was
+    loaded from, and of the packaged licenses and policies. Configurations
+    in directories below the root are not cached, since they are loaded as
+    they are needed.
+
+    Since loading a pickle can run arbitrary code, the cache is kept in a
+    directory private to the user (see for_root) rather than in the project,
+    and is only loaded if it is owned by the user and not writable by anyone
+    else.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        # the last loaded project came from the cache
+        self.loaded = False
+
+    @classmethod
+    def for_root(cls, root):
+        """
+        Get the configuration cache of the project at root, which is stored
+        in the cache directory of the user.
+        """
+
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(
+            os.path.expanduser('~'), '.cache')
+        name = hashlib.sha1(
+            os.fsencode(os.path.abspath(root))).hexdigest()
+        return cls(os.path.join(base, 'fosslint', name))
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, CONFIG_CACHE_FILE)
+
+    def private(self, st):
+        """
+        Test if the given stat belongs to something only the current user
+        can modify.
+        """
+
+        getuid = getattr(os, 'getuid', None)
+
+        if getuid is not None and st.st_uid != getuid():
+            return False
+
+        return not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+    def open(self):
+        """
+        Open the cache file for reading, or return None if it isn't private.
+        """
+
+        if not self.private(os.lstat(self.directory)):
+            return None
+
+        fd = os.open(self.path, os.O_RDONLY | getattr(os, 'O_NOFOLLOW', 0))
+        st = os.fstat(fd)
+
+        if not stat.S_ISREG(st.st_mode) or not self.private(st):
+            os.close(fd)
+            return None
+
+        return os.fdopen(fd, 'rb')
+
+    def key(self, root):
+        # the current year is part of the key, since it is used when
+        # auto_year is enabled.
+        return [CONFIG_CACHE_VERSION, sys.hexversion, root, package_state(),
+                datetime.date.today().year]
+
+    def valid(self, root, key, recorded, inputs):
+        """
+        Test if a cached configuration, loaded from the recorded inputs, is
+        still valid given the current digests of the configuration files.
+        """
+
+        if key != self.key(root):
+            return False
+
+        if any(path not in recorded for path in inputs):
+            return False
+
+        for path, digest in recorded.items():
+            if path in inputs:
+                current = inputs[path]
+            else:
+                current = file_digest(path)
+
+            if current != digest:
+                return False
+
+        return True
+
+    def load(self, root, inputs, log, stats=None):
+        """
+        Load the project at root from the cache, where inputs are the
+        digests of its configuration files.
+
+        Returns None if there is no valid cached configuration.
+        """
+
+        self.loaded = False
+        context = Context(root, stats)
+
+        try:
+            f = self.open()
+
+            if f is None:
+                return None
+
+            with f:
+                key, recorded = pickle.load(f)
+
+                if not self.valid(root, key, recorded, inputs):
+                    return None
+
+                project, headers = ProjectUnpickler(f, context, log).load()
+        except Exception:
+            # missing, corrupt, or written by an incompatible version.
+            return None
+
+        context.inputs = recorded
+        context.headers = headers
+        headers.hits = 0
+        headers.misses = 0
+        project.reset()
+
+        self.loaded = True
+        context.stats.count('config cache hits')
+        return project
+
+    def save(self, project, log=sys.stderr):
+        """
+        Save the configuration of the given project, which must have been
+        loaded by load_project, returning True if it was saved.
+
+        Like Cache.save, failing to save only prints a warning to log.
+        """
+
+        try:
+            self.write(project)
+        except OSError as e:
+            print('Failed to save configuration cache: {}'.format(e),
+                  file=log)
+            return False
+
+        return True
+
+    def write(self, project):
+        """
+        Write the configuration of the given project, see save.
+        """
+
+        import tempfile
+
+        context = project.context
+
+        # nested projects are loaded from configurations which are not part
+        # of the key.
+        snapshot = copy.copy(project)
+        snapshot.directories = None
+
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix='.config-')
+
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump((self.key(context.root), context.inputs), f)
+                ProjectPickler(f, context, project.log).dump(
+                    (snapshot, context.headers))
+
+            os.replace(tmp, self.path)
+        except:
+            os.unlink(tmp)
+            raise
@@ -1,28 +1,82 @@
 import os
 
+from .header_cache import HeaderCache
 from .licenses import load_license_header
 from .licenses import load_license_header_path
+from .stats import NullStats
+from .utils import file_digest
+from .utils import read_head
+from .utils import read_prefix
 from .utils import strip_lineend
 
 class Context:
-    def __init__(self, root):
+    def __init__(self, root, stats=None):
         self.root = root
+        self.headers = HeaderCache()
+        # shared extension instances, see load_extension
+        self.extensions = dict()
+        # instrumentation, see Stats
+        self.stats = stats if stats is not None else NullStats()
+        # reads the staged content of files instead, see BlobReader
+        self.blobs = None
+        # path -> digest of every file the configuration was loaded from,
+        # see ConfigCache
+        self.inputs = dict()
 
-    def absolute_path(self, path):
+    def absolute_path(self, path, directory=''):
         """
-        Get the absolute path as defined by the root of the project.
+        Get the absolute path as defined by the root of the project, or by
+        the given directory relative to the root (like `/src`).
         """
 
         if path.startswith('/'):
             return path
 
-        return os.path.join(self.root, path)
+        return os.path.join(self.root, directory.lstrip('/'), path)
+
+    def render_header(self, ext, license_header, kw):
+        """
+        Render the given license header as a comment using the given
+        extension, see HeaderCache.
+        """
+
+        return self.headers.render(ext, license_header, kw)
+
+    def header_trie(self, ext, license_header, accepted, kw):
+        """
+        Build a trie of the given license header and the accepted headers,
+        see HeaderCache.trie.
+        """
+
+        return self.headers.trie(ext, license_header, accepted, kw)
 
     def load_license_header(self, name):
         return load_license_header(name)
 
     def load_license_header_path(self, path):
+        # digest first, so that a concurrent change invalidates the cache.
+        self.inputs[path] = file_digest(path)
         return load_license_header_path(path)
 
+    def read_head(self, path, limit, max_size=None):
+        """
+        Read the beginning of a file, see read_head.
+        """
+
+        if self.blobs is not None:
+            return self.blobs.read_head(path, limit, max_size=max_size)
+
+        return read_head(path, limit, max_size=max_size)
+
+    def read_prefix(self, path, size, max_size=None):
+        """
+        Read the raw bytes at the beginning of a file, see read_prefix.
+        """
+
+        if self.blobs is not None:
+            return self.blobs.read_prefix(path, size, max_size=max_size)
+
+        return read_prefix(path, size, max_size=max_size)
+
     def strip_lineend(self, line):
         return strip_lineend(line)
@@ -0,0 +1,163 @@
+import collections
+import os
+
+# executors by name, as attributes of concurrent.futures which are imported
+# when first used.
+EXECUTORS = {}
+EXECUTORS['thread'] = 'ThreadPoolExecutor'
+EXECUTORS['process'] = 'ProcessPoolExecutor'
+
+# number of files handed to a worker at a time.
+CHUNK_SIZE = 64
+# number of batches in flight per worker.
+WINDOW_PER_JOB = 2
+
+
+def check_file(context, opt):
+    """
+    Check a single file, returning plain ViolationRecord's.
+    """
+
+    with context.stats.file(opt.relative):
+        return opt.check(context)
+
+
+def check_batch(context, opts):
+    """
+    Check a batch of files, returning their records together with what the
+    stats of a worker process has recorded.
+    """
+
+    results = [check_file(context, opt) for opt in opts]
+    return results, context.stats.snapshot()
+
+
+def resolve_jobs(jobs):
+    """
+    Resolve the number of workers to use, where 0 means one per CPU.
+    """
+
+    if jobs is None:
+        return 1
+
+    if jobs == 0:
+        return os.cpu_count() or 1
+
+    if jobs < 0:
+        raise Exception('Number of jobs must not be negative: ' + str(jobs))
+
+    return jobs
+
+
+class Batch:
+    """
+    A batch of files, some of which might already have known results.
+    """
+
+    def __init__(self):
+        # [(opt, records)], where records is None if not yet known
+        self.items = []
+        self.future = None
+        self.context = None
+
+    def submit(self, pool, context):
+        pending = [opt for opt, records in self.items if records is None]
+
+        if len(pending) > 0:
+            self.context = context
+            self.future = pool.submit(check_batch, context, pending)
+
+    def results(self):
+        checked = []
+
+        if self.future is not None:
+            checked, snapshot = self.future.result()
+
+            if snapshot is not None:
+                self.context.stats.merge(snapshot)
+
+        checked = iter(checked)
+
+        for opt, records in self.items:
+            if records is None:
+                records = next(checked)
+
+            yield opt, records
+
+
+def lookup(context, cache, opt):
+    if cache is None:
+        return None
+
+    return cache.lookup(context, opt)
+
+
+def store(cache, opt, records):
+    if cache is not None:
+        cache.store(opt, records)
+
+
+def check_files(context, opts, jobs=1, executor='thread', cache=None):
+    """
+    Check all the given options, yielding (opt, records) in the same order as
+    opts regardless of which worker finishes first.
+
+    Options are consumed lazily, and only a bounded number of files are in
+    flight at any one time so results are available as soon as possible.
+    Files with results in the given cache are not checked again.
+    """
+
+    jobs = resolve_jobs(jobs)
+
+    if jobs == 1:
+        for opt in opts:
+            records = lookup(context, cache, opt)
+
+            if records is None:
+                records = check_file(context, opt)
+                store(cache, opt, records)
+
+            yield opt, records
+
+        return
+
+    try:
+        executor = EXECUTORS[executor]
+    except KeyError:
+        raise Exception('Unsupported executor (' + executor + ')')
+
+    import concurrent.futures
+    executor = getattr(concurrent.futures, executor)
+
+    window = collections.deque()
+    batch = Batch()
+
+    def drain(limit):
+        while len(window) > limit:
+            for opt, records in window.popleft().results():
+                store(cache, opt, records)
+                yield opt, records
+
+    with executor(max_workers=jobs) as pool:
+        try:
+            for opt in opts:
+                batch.items.append((opt, lookup(context, cache, opt)))
+
+                if len(batch.items) < CHUNK_SIZE:
+                    continue
+
+                batch.submit(pool, context)
+                window.append(batch)
+                batch = Batch()
+
+                yield from drain(jobs * WINDOW_PER_JOB)
+
+            batch.submit(pool, context)
+            window.append(batch)
+
+            yield from drain(0)
+        finally:
+            # stopped early, don't wait for work which hasn't started.
+            for b in window:
+                if b.future is not None:
+                    b.future.cancel()
@@ -1,18 +1,52 @@
+import os
+
 from .extension import Extension
-from .java import Java
-from .python import Python
-from .c_style import CStyle
-from .generic import Hash
+from .languages import LANGUAGES
+from .languages import NAMES
+from .languages import SUFFIXES
 
-EXTENSIONS = []
-EXTENSIONS.append(Python)
-EXTENSIONS.append(Java)
-EXTENSIONS.append(CStyle)
-EXTENSIONS.append(Hash)
+def extension_class(path, language=None):
+    """
+    Determine the extension class to use for the given path.
 
-def load_extension(context, path, opt):
-    for ext in EXTENSIONS:
-        if ext.matches(path, opt):
-            return ext(context, path, opt)
+    An explicit language takes precedence over the name of the file.
+    """
+
+    if language is not None:
+        try:
+            return LANGUAGES[language]
+        except KeyError:
+            raise Exception('Unsupported language (' + language + '): ' + path)
+
+    name = os.path.basename(path)
+    cls = NAMES.get(name)
+
+    if cls is not None:
+        return cls
+
+    cls = SUFFIXES.get(os.path.splitext(name)[1])
+
+    if cls is not None:
+        return cls
 
     raise Exception('Cannot determine language of file: ' + path)
+
+def load_extension(context, path, opt):
+    """
+    Load the extension for the given path.
+
+    Extensions only depend on the class and the options which affect comment
+    syntax, so instances are shared through the context.
+    """
+
+    cls = extension_class(path, opt.language)
+
+    key = (cls, opt.start_comment, opt.end_comment, opt.license_header_pad,
+           bool(opt.strip_license))
+
+    ext = context.extensions.get(key)
+
+    if ext is None:
+        ext = context.extensions[key] = cls(context, path, opt)
+
+    return ext
@@ -1,66 +1,136 @@
 from .extension import Extension
 
-class HashBasedComments:
+def is_shebang(line):
+    # rust inner attributes (#![...]) look like shebangs.
+    return line.startswith('#!') and not line.startswith('#![')
+
+class LineComments:
     """
-    Comments that are hash-based (#).
+    Comments where every line is prefixed with a comment marker.
     """
 
+    comment = u'#'
+
     def __init__(self, context, path, opt):
         self.context = context
         self.pad = opt.license_header_pad if opt.license_header_pad else u' '
         self.opt = opt
 
+    def is_preamble(self, line):
+        """
+        Check if the first line is a preamble which precedes the header.
+        """
+
+        return is_shebang(line)
+
     def find_header_range(self, lines):
-        if len(lines) == 0:
-            return (0, 0)
+        """
+        Find the header range in the given lines, which may be any iterable.
+
+        Lines are consumed one at a time and iteration stops as soon as the
+        end of the header has been seen.
+        """
 
         start = 0
+        end = 0
 
         for i, line in enumerate(lines):
-            if i == 0 and line.startswith('#!'):
-                start = 1
+            if i == 0 and self.is_preamble(line):
+                start = end = 1
                 continue
 
-            if not line.rstrip().startswith('#'):
+            if not line.rstrip().startswith(self.comment):
                 return (start, i)
 
-        return (start, i + 1)
+            end = i + 1
+
+        return (start, end)
+
+    def header_signature(self):
+        return (type(self), self.pad, bool(self.opt.strip_license))
 
     def render_header_comment(self, lines):
         for line in lines:
             s = self.context.strip_lineend(line)
 
             if self.opt.strip_license and len(s) == 0:
-                yield u'#'
+                yield self.comment
                 continue
 
-            yield u'#' + self.pad + s
+            yield self.comment + self.pad + s
 
-class CBasedComments:
+class HashBasedComments(LineComments):
     """
-    Comments that are based on C.
+    Comments that are hash-based (#).
     """
 
+    comment = u'#'
+
+class SlashBasedComments(LineComments):
+    """
+    Comments that are slash-based (//).
+    """
+
+    comment = u'//'
+
+class BlockComments:
+    """
+    Comments that are delimited by a start and an end marker.
+    """
+
+    start_comment = u'/*'
+    end_comment = u'*/'
+    # prefix of each line in the comment
+    line_prefix = u' *'
+    # prefix of the line ending the comment
+    end_prefix = u' '
+
     def __init__(self, context, path, opt):
         self.context = context
-        self.start_comment = opt.start_comment if opt.start_comment else u'/*'
-        self.end_comment = opt.end_comment if opt.end_comment else u'*/'
+
+        if opt.start_comment:
+            self.start_comment = opt.start_comment
+
+        if opt.end_comment:
+            self.end_comment = opt.end_comment
+
         self.pad = opt.license_header_pad if opt.license_header_pad else u' '
         self.opt = opt
 
+    def is_preamble(self, line):
+        """
+        Check if the first line is a preamble which precedes the header.
+
+        Block comments have no preamble by default, a shebang is compared
+        with the header like any other line.
+        """
+
+        return False
+
     def find_header_range(self, lines):
+        """
+        Find the header range in the given lines, which may be any iterable.
+        """
+
+        start = 0
+
         for i, line in enumerate(lines):
-            if i == 0:
+            if i == 0 and self.is_preamble(line):
+                start = 1
+                continue
+
+            if i == start:
                 if not line.lstrip().startswith(self.start_comment):
                     break
 
             if line.rstrip().endswith(self.end_comment):
-                return (0, i + 1)
+                return (start, i + 1)
 
-            if line.lstrip().startswith('*'):
-                continue
+        return (start, start)
 
-        return (0, 0)
+    def header_signature(self):
+        return (type(self), self.start_comment, self.end_comment, self.pad,
+                bool(self.opt.strip_license))
 
     def render_header_comment(self, lines):
         yield self.start_comment
@@ -69,9 +139,27 @@ class CBasedComments:
             s = self.context.strip_lineend(line)
 
             if self.opt.strip_license and len(s) == 0:
-                yield u' *'
+                yield self.line_prefix
                 continue
 
-            yield u' *' + self.pad + s
+            yield self.line_prefix + self.pad + s
+
+        yield self.end_prefix + self.end_comment
+
+class CBasedComments(BlockComments):
+    """
+    Comments that are based on C.
+    """
+
+class XmlComments(BlockComments):
+    """
+    Comments that are based on XML (<!-- -->).
+    """
+
+    start_comment = u'<!--'
+    end_comment = u'-->'
+    line_prefix = u' '
+    end_prefix = u''
 
-        yield u' ' + self.end_comment
+    def is_preamble(self, line):
+        return line.startswith('<?xml')
@@ -9,10 +9,20 @@ class Extension:
     def find_header_range(self, lines):
         """
         Find the range in lines (zero-based) that the header occupies.
+
+        Lines may be any iterable, and should only be consumed as far as is
+        needed to find the end of the header.
         """
 
         return (0, 0)
 
+    def header_signature(self):
+        """
+        Everything which affects how render_header_comment renders a header.
+        """
+
+        return (type(self),)
+
     def render_header_comment(self, lines):
         """
         Render the header comment given the lines of a license.
@@ -20,10 +30,3 @@ class Extension:
 
         for line in lines:
             yield line
-
-    @classmethod
-    def matches(cls, path):
-        """
-        Check if this extension matches the given path.
-        """
-        return False
@@ -1,13 +1,13 @@
 from .extension import Extension
 from .common import HashBasedComments
+from .common import SlashBasedComments
 
 class Hash(HashBasedComments, Extension):
-    def __init__(self, context, path, opt):
-        super().__init__(context, path, opt)
-        self.context = context
-        self.path = path
-        self.opt = opt
+    """
+    Languages with hash-based comments (shell, YAML, TOML, Makefiles).
+    """
 
-    @classmethod
-    def matches(cls, path, opt):
-        return opt.language == 'hash'
+class Slash(SlashBasedComments, Extension):
+    """
+    Languages with slash-based line comments (Go, Rust).
+    """
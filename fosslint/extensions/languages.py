@@ -0,0 +1,38 @@
+from .java import Java
+from .python import Python
+from .c_style import CStyle
+from .generic import Hash
+from .generic import Slash
+from .xml import Xml
+
+# language, extension class, file suffixes
+TABLE = [
+    ('python', Python, ['.py']),
+    ('java', Java, ['.java']),
+    ('c-style', CStyle, ['.h', '.hpp', '.c', '.cpp', '.m']),
+    ('javascript', CStyle, ['.js', '.jsx', '.mjs', '.cjs']),
+    ('typescript', CStyle, ['.ts', '.tsx']),
+    ('go', Slash, ['.go']),
+    ('rust', Slash, ['.rs']),
+    ('shell', Hash, ['.sh', '.bash', '.zsh']),
+    ('yaml', Hash, ['.yml', '.yaml']),
+    ('toml', Hash, ['.toml']),
+    ('xml', Xml, ['.xml', '.xsd', '.xsl', '.xslt']),
+    ('hash', Hash, []),
+    ('slash', Slash, []),
+]
+
+# file names which don't have a suffix
+NAMES = {
+    'Makefile': Hash,
+    'Dockerfile': Hash,
+}
+
+LANGUAGES = dict()
+SUFFIXES = dict()
+
+for language, cls, suffixes in TABLE:
+    LANGUAGES[language] = cls
+
+    for suffix in suffixes:
+        SUFFIXES[suffix] = cls
@@ -0,0 +1,7 @@
+from .extension import Extension
+from .common import XmlComments
+
+class Xml(XmlComments, Extension):
+    """
+    XML, and languages with XML-style comments.
+    """
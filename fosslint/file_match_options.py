@@ -1,27 +1,83 @@
-import difflib
+import hashlib
 import itertools
+import json
 import os
 
 from .violation import Violation
+from .violation import ViolationRecord
 from .licenses import load_license_header
 from .licenses import load_license_header_path
 from .extensions import load_extension
+from .fixer import rewrite_header
+from .pattern_section import MAX_SKIP_LINE
+from .utils import MAX_HEADER_LINE
 from .utils import strip_lineend
+from .utils import SkippedFile
+
+# lines read past the expected header length, to account for things like
+# shebangs preceding the header.
+HEADER_SLACK = 8
+
+# settings resolved from the global section and the matching pattern sections,
+# in the order they are stored.
+SETTINGS = ('license_header', 'license_header_path', 'license_header_pad',
+            'start_comment', 'end_comment', 'skip_header_lines',
+            'skip_header_on_stanza', 'strip_license', 'language',
+            'accepted_headers')
+
+class CompiledOptions:
+    """
+    The effective options of every file which matches the same pattern
+    sections, in the same order.
+
+    Compiled options are shared between files and are immutable.
+    skip_header_lines is a bitmap, where bit i is set if line i of the header
+    is skipped, up to MAX_SKIP_LINE. skip_header_ranges are the ranges of
+    skipped lines past it, which are rarely used.
+    """
+
+    __slots__ = ('global_section', 'skip_header_ranges') + SETTINGS
+
+    def __init__(self, global_section, sections):
+        values = dict(
+            license_header=global_section.license_header,
+            license_header_path=global_section.license_header_path,
+            license_header_pad=global_section.license_header_pad,
+            strip_license=global_section.strip_license,
+            skip_header_lines=0,
+        )
 
-class FileMatchOptions:
-    def __init__(self, global_section, relative, path):
-        self.global_section = global_section
-        self.relative = relative
-        self.path = path
-        self.license_header = global_section.license_header
-        self.license_header_path = global_section.license_header_path
-        self.license_header_pad = global_section.license_header_pad
-        self.start_comment = None
-        self.end_comment = None
-        self.skip_header_lines = None
-        self.skip_header_on_stanza = None
-        self.strip_license = global_section.strip_license
-        self.language = None
+        # sections are loaded in order, so that later sections override
+        # earlier ones.
+        for section in sections:
+            for name in SETTINGS:
+                value = getattr(section, name)
+
+                if value is not None:
+                    values[name] = value
+
+        skip_header_lines = values['skip_header_lines']
+        skip_header_ranges = ()
+
+        if skip_header_lines:
+            values['skip_header_lines'] = skip_header_lines.bitmap()
+            skip_header_ranges = skip_header_lines.beyond()
+
+        object.__setattr__(self, 'global_section', global_section)
+        object.__setattr__(self, 'skip_header_ranges', skip_header_ranges)
+
+        for name in SETTINGS:
+            object.__setattr__(self, name, values.get(name))
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Compiled options are immutable')
+
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
 
     @property
     def kw(self):
@@ -30,146 +86,431 @@ class FileMatchOptions:
             "year": self.global_section.year
         }
 
-    def load_section(self, section):
-        if section.license_header is not None:
-            self.license_header = section.license_header
+    def skipped(self, line):
+        """
+        Test if the given line of the header is skipped.
+        """
 
-        if section.license_header_path is not None:
-            self.license_header_path = section.license_header_path
+        if line <= MAX_SKIP_LINE:
+            return (self.skip_header_lines >> line) & 1
 
-        if section.start_comment is not None:
-            self.start_comment = section.start_comment
+        return any(start <= line <= end
+                   for (start, end) in self.skip_header_ranges)
 
-        if section.end_comment is not None:
-            self.end_comment = section.end_comment
+    def effective_license_header(self):
+        license_header = None
 
-        if section.skip_header_lines is not None:
-            self.skip_header_lines = section.skip_header_lines
+        if self.license_header is not None:
+            license_header = self.license_header
 
-        if section.skip_header_on_stanza is not None:
-            self.skip_header_on_stanza = section.skip_header_on_stanza
+        if self.license_header_path is not None:
+            license_header = self.license_header_path
 
-        if section.strip_license is not None:
-            self.strip_license = section.strip_license
+        return license_header
 
-        if section.language is not None:
-            self.language = section.language
+    def fingerprint(self, context, path):
+        """
+        Build a fingerprint of everything that affects the result of check()
+        for the file at path.
+        """
 
-        if section.license_header_pad is not None:
-            self.license_header_pad = section.license_header_pad
+        ext = load_extension(context, path, self)
+        license_header = self.effective_license_header()
 
-    def evaluate(self, context):
-        ext = load_extension(context, self.path, self)
+        expected = None
 
-        errors = []
+        if license_header is not None:
+            expected = list(
+                context.render_header(ext, license_header, self.kw))
+
+        accepted = None
+
+        if self.accepted_headers:
+            accepted = [[name, list(text.lines)]
+                        for name, text in self.accepted_headers]
+
+        data = [
+            type(ext).__name__,
+            expected,
+            self.start_comment,
+            self.end_comment,
+            self.skip_header_lines,
+            self.skip_header_ranges,
+            self.skip_header_on_stanza,
+            self.global_section.max_file_size,
+            self.global_section.report_skipped_files,
+            accepted,
+        ]
+
+        data = json.dumps(data).encode('utf-8')
+        return hashlib.sha1(data).hexdigest()
+
+    def check(self, context, path):
+        """
+        Run all checks for the file at path, returning a list of
+        ViolationRecord.
+        """
 
-        license_header = None
+        ext = load_extension(context, path, self)
 
-        if self.license_header is not None:
-            license_header = self.license_header
+        errors = []
 
-        if self.license_header_path is not None:
-            license_header = self.license_header_path
+        license_header = self.effective_license_header()
 
         if license_header is not None:
             errors.append(self.check_expect_line_header(
-                self.path, ext, license_header))
+                context, path, ext, license_header))
 
         return list(itertools.chain(*errors))
 
-    def render_fixed(self, path, ext, range_index, license_header):
-        lines = []
+    def bind(self, context, record):
+        """
+        Bind a ViolationRecord produced by check() to a fixable Violation.
+        """
 
-        with open(path) as f:
-            for line in f:
-                lines.append(line)
+        if record.range_index is None:
+            return Violation(
+                path=record.path,
+                line=record.line,
+                message=record.message,
+                kind=record.kind,
+                expected=record.expected,
+                actual=record.actual
+            )
 
-        rendered = ext.render_header_comment(
-            license_header.render(**self.kw)
+        return Violation(
+            path=record.path,
+            line=record.line,
+            message=record.message,
+            kind=record.kind,
+            expected=record.expected,
+            actual=record.actual,
+            offset=record.range_index[0],
+            options=self
         )
 
-        start_index, end_index = range_index
+    def render_header_fix(self, context, ext, license_header, lines,
+                          start_index):
+        """
+        Render the lines of a fixed header, where lines are the lines of the
+        file which has been read so far.
 
-        for line in lines[:start_index]:
-            yield line
+        Lines which are skipped through skip_header_lines are kept as-is.
+        """
+
+        rendered = context.render_header(ext, license_header, self.kw)
 
         for line, header_line in enumerate(rendered):
-            if self.skip_header_lines and self.skip_header_lines(line):
-                yield lines[line]
+            skipped = self.skipped(line)
+
+            if skipped and start_index + line < len(lines):
+                yield lines[start_index + line]
             else:
                 yield header_line + u'\n'
 
+    def render_fixed(self, context, lines, ext, license_header):
+        """
+        Render the given lines of a complete file with a fixed header.
+
+        The header range is located again over the full file, since the
+        check only looks at a bounded prefix.
+        """
+
+        start_index, end_index = ext.find_header_range(
+            map(strip_lineend, lines))
+
+        for line in lines[:start_index]:
+            yield line
+
+        for line in self.render_header_fix(
+                context, ext, license_header, lines, start_index):
+            yield line
+
         for line in lines[end_index:]:
             yield line
 
-    def fix_expect_line_header(self, path, ext, range_index, license_header):
-        fixed = list(self.render_fixed(path, ext, range_index, license_header))
+    def fix(self, context, path):
+        """
+        Fix the header of the file at path.
+        """
 
-        with open(path, 'w') as f:
-            for line in fixed:
-                f.write(line)
+        ext = load_extension(context, path, self)
+        self.fix_expect_line_header(
+            context, path, ext, self.effective_license_header())
 
-    def build_diff(self, original_file, path, ext, range_index, license_header):
-        def f():
-            fixed = list(
-                self.render_fixed(path, ext, range_index, license_header)
-            )
+    def diff(self, context, path):
+        """
+        Generate a unified diff of fixing the header of the file at path.
+        """
 
-            return difflib.unified_diff(
-                original_file, fixed,
-                fromfile=path, tofile=path + '.fix'
-            )
+        ext = load_extension(context, path, self)
+        return self.build_diff(
+            context, path, ext, self.effective_license_header())
+
+    def fix_expect_line_header(self, context, path, ext, license_header):
+        def render(lines, start_index):
+            return self.render_header_fix(
+                context, ext, license_header, lines, start_index)
 
-        return f
+        rewrite_header(path, ext, render)
 
-    def check_expect_line_header(self, path, ext, license_header):
+    def build_diff(self, context, path, ext, license_header):
+        # only needed when fixing
+        import difflib
+
+        # the diff is only displayed, the fix itself preserves any bytes
+        # which aren't valid UTF-8.
+        with open(path, encoding='utf-8', errors='replace') as original:
+            original_file = list(original)
+
+        fixed = list(self.render_fixed(
+            context, original_file, ext, license_header))
+
+        return difflib.unified_diff(
+            original_file, fixed,
+            fromfile=path, tofile=path + '.fix'
+        )
+
+    def check_expect_line_header(self, context, path, ext, license_header):
         """
         Check that the given license header matches.
+
+        Only a bounded prefix of the file is read, large enough to contain the
+        expected header and some leading lines (like a shebang).
+
+        The raw bytes of the file are compared first, and only if they differ
+        is the file decoded and compared line by line, to find the line of
+        the violation.
         """
 
-        expected_lines = ext.render_header_comment(
-            license_header.render(**self.kw)
-        )
+        stats = context.stats
+
+        with stats.phase('render'):
+            expected_lines = context.render_header(
+                ext, license_header, self.kw)
+
+            trie = None
+            limit = len(expected_lines)
+
+            if self.accepted_headers:
+                trie = context.header_trie(
+                    ext, license_header, self.accepted_headers, self.kw)
+                limit = trie.depth
+
+        with stats.phase('read'):
+            try:
+                if self.match_header_bytes(context, path, ext, expected_lines):
+                    stats.count('headers matched as bytes')
+                    return
+
+                head = self.read_header(
+                    context, path, ext, limit + HEADER_SLACK)
+            except SkippedFile as e:
+                stats.count('files skipped: ' + e.kind)
+
+                if self.global_section.report_skipped_files:
+                    yield ViolationRecord(
+                        path=path, line=0, kind=e.kind, message=str(e))
+
+                return
+            except OSError as e:
+                yield ViolationRecord(
+                    path=path,
+                    line=0,
+                    kind="Unreadable File",
+                    message="Failed to read file: {}: {}".format(
+                        path, e.strerror or e)
+                )
+
+                return
+
+        if stats.enabled:
+            stats.count('bytes read', sum(len(line) for line in head))
+
+        with stats.phase('compare'):
+            if trie is None:
+                records = self.compare_header(path, ext, head, expected_lines)
+            else:
+                records = self.compare_variants(stats, path, ext, head, trie)
+
+            for record in records:
+                yield record
+
+    def match_header_bytes(self, context, path, ext, expected):
+        """
+        Test if the file at path starts with the expected header, comparing
+        raw bytes.
+
+        The header is expected after a preamble (like a shebang) if the
+        extension finds one, and with the line ends of the first line
+        following it. Any other difference, including in lines skipped
+        through skip_header_lines, is left to compare_header.
+        """
+
+        data = context.read_prefix(
+            path, len(expected.encoded_crlf) + MAX_HEADER_LINE,
+            max_size=self.global_section.max_file_size)
+
+        if context.stats.enabled:
+            context.stats.count('bytes read', len(data))
+
+        first = data.find(b'\n')
+
+        if first < 0:
+            return False
 
         try:
-            original_file = list(open(path))
-        except:
-            raise Exception("Failed to read original file: " + path)
+            line = strip_lineend(data[:first].decode('utf-8'))
+        except UnicodeDecodeError:
+            return False
+
+        start = 0
+
+        if ext.find_header_range(iter([line]))[0] > 0:
+            start = first + 1
+
+        end = data.find(b'\n', start)
+
+        if end > start and data[end - 1:end] == b'\r':
+            return data.startswith(expected.encoded_crlf, start)
+
+        return data.startswith(expected.encoded, start)
+
+    def read_header(self, context, path, ext, limit):
+        """
+        Read the beginning of a file, which is at least `limit` lines and
+        contains the entire header.
+
+        The header of a file can be longer than expected, in which case
+        reading continues until it ends, since something like
+        skip_header_on_stanza might be found in the part not yet read.
+        """
+
+        while True:
+            head = context.read_head(
+                path, limit, max_size=self.global_section.max_file_size)
+
+            if len(head) < limit:
+                return head
+
+            _, end_index = ext.find_header_range(map(strip_lineend, head))
+
+            if end_index < len(head):
+                return head
+
+            limit *= 2
+
+    def header_lines(self, ext, head):
+        """
+        Find the lines of the header in the beginning of a file, returning
+        (range_index, lines) or None if the header shouldn't be checked.
+        """
 
-        file_lines = list(map(strip_lineend, original_file))
+        file_lines = list(map(strip_lineend, head))
 
         # the last line of the header block
-        range_index = ext.find_header_range(file_lines)
+        range_index = ext.find_header_range(iter(file_lines))
 
-        if range_index != (0, 0):
-            start_index, end_index = range_index
-            file_lines = file_lines[start_index:end_index]
+        if range_index == (0, 0):
+            # no header, compare with the beginning of the file.
+            return range_index, file_lines
 
-            stanza = self.skip_header_on_stanza
+        start_index, end_index = range_index
 
-            # skip header stanza is defined and matches a header line.
-            if stanza and any(stanza in line for line in file_lines):
-                return
+        # a preamble (like a shebang) which isn't followed by a header leaves
+        # nothing to compare.
+        file_lines = file_lines[start_index:end_index]
+
+        stanza = self.skip_header_on_stanza
+
+        # skip header stanza is defined and matches a header line.
+        if stanza and any(stanza in line for line in file_lines):
+            return None
+
+        return range_index, file_lines
+
+    def compare_variants(self, stats, path, ext, head, trie):
+        """
+        Compare the beginning of a file with the license header and the
+        accepted headers, reporting the closest one on a mismatch.
+        """
+
+        header = self.header_lines(ext, head)
+
+        if header is None:
+            return
+
+        range_index, file_lines = header
+        matched, variant, i = trie.classify(file_lines, self.skipped)
+
+        if matched:
+            stats.count('headers matched: ' + trie.names[variant])
+            return
+
+        line = file_lines[i]
+        expect = trie.text(variant, i)
+
+        yield ViolationRecord(
+            path=path,
+            line=i,
+            kind="License Header Mismatch",
+            message="\"{}\" != \"{}\" (closest: {})".format(
+                line, expect, trie.names[variant]),
+            range_index=range_index,
+            expected=expect,
+            actual=line
+        )
+
+    def compare_header(self, path, ext, head, expected_lines):
+        """
+        Compare the beginning of a file with the expected header lines.
+        """
+
+        header = self.header_lines(ext, head)
+
+        if header is None:
+            return
+
+        range_index, file_lines = header
 
         for i, (line, expect) in enumerate(zip(file_lines, expected_lines)):
-            if self.skip_header_lines and self.skip_header_lines(i):
+            if self.skipped(i):
                 continue
 
             if line != expect:
-                yield Violation(
+                yield ViolationRecord(
                     path=path,
                     line=i,
-                    message="\"{}\" != \"{}\"".format(line, expect),
                     kind="License Header Mismatch",
-                    fix=lambda: self.fix_expect_line_header(
-                        path, ext, range_index, license_header
-                    ),
-                    describe_fix=lambda: "Fix Header",
-                    diff=self.build_diff(
-                        original_file, path, ext, range_index, license_header
-                    )
+                    message="\"{}\" != \"{}\"".format(line, expect),
+                    range_index=range_index,
+                    expected=expect,
+                    actual=line
                 )
 
                 break
 
 
+class FileMatchOptions:
+    """
+    A file to check, together with the compiled options which apply to it.
+    """
+
+    __slots__ = ('options', 'relative', 'path')
+
+    def __init__(self, options, relative, path):
+        self.options = options
+        self.relative = relative
+        self.path = path
+
+    def fingerprint(self, context):
+        return self.options.fingerprint(context, self.path)
+
+    def check(self, context):
+        return self.options.check(context, self.path)
+
+    def bind(self, context, record):
+        return self.options.bind(context, record)
+
+    def evaluate(self, context):
+        return [self.bind(context, r) for r in self.check(context)]
@@ -0,0 +1,152 @@
+import os
+
+from .utils import strip_lineend
+
+# size of blocks used when copying the remainder of a file.
+BLOCK_SIZE = 1024 * 1024
+ENCODING = 'utf-8'
+ERRORS = 'surrogateescape'
+
+
+class HeadReader:
+    """
+    Reads lines from the beginning of a binary file, one at a time.
+
+    Every line read is kept in `lines`, so that reading can stop once the end
+    of the header is found and the rest of the file copied as-is.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.lines = []
+
+    def __iter__(self):
+        while True:
+            line = self.f.readline()
+
+            if not line:
+                return
+
+            self.lines.append(line)
+            yield strip_lineend(decode(line))
+
+
+def decode(line):
+    return line.decode(ENCODING, ERRORS)
+
+
+def encode(line):
+    return line.encode(ENCODING, ERRORS)
+
+
+def copy_metadata(st, path):
+    """
+    Copy the permissions and ownership of a file with the given stat to path.
+    """
+
+    os.chmod(path, st.st_mode & 0o7777)
+
+    if hasattr(os, 'chown'):
+        try:
+            os.chown(path, st.st_uid, st.st_gid)
+        except PermissionError:
+            pass
+
+
+def rewrite_header(path, ext, render):
+    """
+    Replace the header of the file at path.
+
+    render is called with the lines of the file read so far, and the start of
+    the header range, and should return the lines of the new header.
+
+    The result is written to a temporary file in the same directory, with the
+    remainder of the original file copied in large blocks, which then
+    atomically replaces the original file.
+    """
+
+    import shutil
+    import tempfile
+
+    path = os.path.realpath(path)
+    st = os.stat(path)
+
+    with open(path, 'rb') as src:
+        reader = HeadReader(src)
+        start_index, end_index = ext.find_header_range(iter(reader))
+        head = reader.lines
+
+        fd, tmp = tempfile.mkstemp(
+            dir=os.path.dirname(path),
+            prefix='.' + os.path.basename(path) + '.',
+            suffix='.fix')
+
+        try:
+            with os.fdopen(fd, 'wb') as dst:
+                for line in head[:start_index]:
+                    dst.write(line)
+
+                lines = [decode(line) for line in head]
+
+                for line in render(lines, start_index):
+                    dst.write(encode(line))
+
+                for line in head[end_index:]:
+                    dst.write(line)
+
+                shutil.copyfileobj(src, dst, BLOCK_SIZE)
+
+            copy_metadata(st, tmp)
+            os.replace(tmp, path)
+        except:
+            os.unlink(tmp)
+            raise
+
+
+class FixReport:
+    """
+    Outcome of fixing a single file.
+    """
+
+    def __init__(self, path, error=None):
+        self.path = path
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def apply_fix(context, e):
+    try:
+        e.fix(context)
+    except Exception as error:
+        return FixReport(e.path, error)
+
+    return FixReport(e.path)
+
+
+def apply_fixes(context, violations, jobs=1):
+    """
+    Apply the fixes of all the given violations, yielding a FixReport for
+    each in order.
+
+    Fixes are I/O bound and not picklable, so they are always applied using
+    threads.
+    """
+
+    from .executor import resolve_jobs
+
+    jobs = resolve_jobs(jobs)
+
+    if jobs == 1:
+        for e in violations:
+            yield apply_fix(context, e)
+
+        return
+
+    import concurrent.futures
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as pool:
+        for report in pool.map(lambda e: apply_fix(context, e), violations):
+            yield report
@@ -0,0 +1,440 @@
+import errno
+import io
+import os
+import struct
+import threading
+
+from .utils import MAX_HEADER_LINE
+from .utils import SNIFF_SIZE
+from .utils import check_size
+from .utils import read_lines
+from .utils import sniff
+
+INDEX_SIGNATURE = b'DIRC'
+# size of the fixed part of an index entry, up until and including flags.
+ENTRY_SIZE = 62
+ENTRY_FORMAT = '>10I20sH'
+
+FLAG_EXTENDED = 0x4000
+FLAG_STAGE = 0x3000
+EXTENDED_SKIP_WORKTREE = 0x4000
+
+MODE_TYPE = 0o170000
+MODE_REGULAR = 0o100000
+
+# index extensions which means that the list of entries is incomplete.
+INCOMPLETE_EXTENSIONS = set([b'link', b'sdir'])
+
+
+class UnsupportedIndex(Exception):
+    pass
+
+
+def find_worktree(root):
+    """
+    Find the top of the git working tree containing root, and its git
+    directory.
+
+    Returns (None, None) if root is not in a git working tree.
+    """
+
+    current = os.path.realpath(root)
+
+    while True:
+        dotgit = os.path.join(current, '.git')
+
+        if os.path.isdir(dotgit):
+            return current, dotgit
+
+        if os.path.isfile(dotgit):
+            with open(dotgit) as f:
+                content = f.read().strip()
+
+            if content.startswith('gitdir:'):
+                gitdir = content[len('gitdir:'):].strip()
+                return current, os.path.join(current, gitdir)
+
+        parent = os.path.dirname(current)
+
+        if parent == current:
+            return None, None
+
+        current = parent
+
+
+def read_varint(data, offset):
+    """
+    Read an offset-encoded integer, as used in version 4 of the index.
+    """
+
+    byte = data[offset]
+    offset += 1
+    value = byte & 0x7f
+
+    while byte & 0x80:
+        byte = data[offset]
+        offset += 1
+        value = ((value + 1) << 7) | (byte & 0x7f)
+
+    return value, offset
+
+
+def parse_index(data):
+    """
+    Parse the paths of all regular files in the given git index.
+    """
+
+    if len(data) < 12 or data[:4] != INDEX_SIGNATURE:
+        raise UnsupportedIndex('Not a git index')
+
+    version, count = struct.unpack('>II', data[4:12])
+
+    if version not in (2, 3, 4):
+        raise UnsupportedIndex('Unsupported index version: ' + str(version))
+
+    offset = 12
+    previous = b''
+    paths = []
+
+    for _ in range(count):
+        start = offset
+        fields = struct.unpack_from(ENTRY_FORMAT, data, offset)
+        mode = fields[6]
+        flags = fields[11]
+        offset += ENTRY_SIZE
+
+        extended = 0
+
+        if version >= 3 and flags & FLAG_EXTENDED:
+            extended, = struct.unpack_from('>H', data, offset)
+            offset += 2
+
+        if version == 4:
+            strip, offset = read_varint(data, offset)
+            end = data.index(b'\0', offset)
+            path = previous[:len(previous) - strip] + data[offset:end]
+            offset = end + 1
+        else:
+            end = data.index(b'\0', offset)
+            path = data[offset:end]
+            # entries are padded with 1-8 nul bytes to a multiple of eight.
+            offset = start + ((end - start + 8) // 8) * 8
+
+        previous = path
+
+        # conflicted entries are listed once per stage.
+        if flags & FLAG_STAGE and paths and paths[-1] == path:
+            continue
+
+        if extended & EXTENDED_SKIP_WORKTREE:
+            continue
+
+        if mode & MODE_TYPE != MODE_REGULAR:
+            continue
+
+        paths.append(path)
+
+    # the trailing 20 bytes is the checksum of the index.
+    while offset + 8 <= len(data) - 20:
+        signature = data[offset:offset + 4]
+        size, = struct.unpack_from('>I', data, offset + 4)
+
+        if signature in INCOMPLETE_EXTENSIONS:
+            raise UnsupportedIndex(
+                'Unsupported index extension: ' + signature.decode('ascii'))
+
+        offset += 8 + size
+
+    return [os.fsdecode(p) for p in paths]
+
+
+def read_index(gitdir):
+    with open(os.path.join(gitdir, 'index'), 'rb') as f:
+        return parse_index(f.read())
+
+
+def ls_files(worktree):
+    """
+    List tracked regular files by asking git.
+    """
+
+    import subprocess
+
+    output = subprocess.check_output(
+        ['git', 'ls-files', '-z', '--stage', '--full-name'], cwd=worktree)
+
+    paths = []
+
+    # <mode> <object> <stage>\t<path>
+    for entry in output.split(b'\0'):
+        if not entry:
+            continue
+
+        info, path = entry.split(b'\t', 1)
+
+        if int(info.split()[0], 8) & MODE_TYPE != MODE_REGULAR:
+            continue
+
+        # conflicted entries are listed once per stage.
+        if paths and paths[-1] == path:
+            continue
+
+        paths.append(path)
+
+    return [os.fsdecode(p) for p in paths]
+
+
+class GitWalker:
+    """
+    Lists the files tracked by git below a root directory.
+
+    The index is parsed directly when possible, otherwise this falls back to
+    running `git ls-files`. Either way, only regular files are listed, going
+    by their mode in the index, and the working tree isn't checked, so that
+    a tracked file which was deleted is reported as unreadable.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        # not applicable, only tracked files are listed.
+        self.pruned = 0
+        # every file in the project is listed
+        self.complete = True
+
+    def tracked(self):
+        worktree, gitdir = find_worktree(self.root)
+
+        if worktree is None:
+            raise Exception('Not in a git repository: ' + self.root)
+
+        try:
+            paths = read_index(gitdir)
+        except (OSError, UnsupportedIndex, struct.error, ValueError):
+            paths = ls_files(worktree)
+
+        prefix = os.path.relpath(os.path.realpath(self.root), worktree)
+
+        if prefix == '.':
+            prefix = ''
+        else:
+            prefix = prefix.replace(os.sep, '/') + '/'
+
+        for p in paths:
+            if p.startswith(prefix):
+                yield p[len(prefix):]
+
+    def walk(self):
+        """
+        Yield (path, relative) for every tracked file below the root.
+        """
+
+        for p in self.tracked():
+            yield (os.path.join(self.root, p), '/' + p)
+
+
+class ChangedWalker(GitWalker):
+    """
+    Lists the files below a root directory which have been added, modified
+    or renamed since the given revision, including changes which are not yet
+    committed and files which are not yet tracked.
+    """
+
+    def __init__(self, root, since):
+        super().__init__(root)
+        self.since = since
+        self.complete = False
+
+    def tracked(self):
+        import subprocess
+
+        changed = subprocess.check_output(
+            ['git', 'diff', '--name-only', '-z', '--no-renames',
+             '--diff-filter=AMR', '--relative', self.since, '--'],
+            cwd=self.root)
+
+        untracked = subprocess.check_output(
+            ['git', 'ls-files', '-z', '--others', '--exclude-standard'],
+            cwd=self.root)
+
+        paths = set(p for p in (changed + untracked).split(b'\0') if p)
+
+        for p in sorted(paths):
+            yield os.fsdecode(p)
+
+    def walk(self):
+        """
+        Yield (path, relative) for every changed regular file below the root.
+        """
+
+        for p in self.tracked():
+            path = os.path.join(self.root, p)
+
+            # neither the diff nor untracked files include the type of files.
+            if not os.path.isfile(path) or os.path.islink(path):
+                continue
+
+            yield (path, '/' + p)
+
+
+# blob readers of a worker process, by root.
+WORKER_READERS = dict()
+# size of blocks skipped at a time when draining a blob which is too large.
+DRAIN_SIZE = 1024 * 1024
+
+
+class StagedWalker(GitWalker):
+    """
+    Lists the files below a root directory which are added, modified or
+    renamed in the index, that is the files which are about to be committed.
+
+    Their content should be read from the index using a BlobReader.
+    """
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.complete = False
+
+    def tracked(self):
+        import subprocess
+
+        staged = subprocess.check_output(
+            ['git', 'diff', '--cached', '--name-only', '-z', '--no-renames',
+             '--diff-filter=AMR', '--relative', '--'],
+            cwd=self.root)
+
+        for p in staged.split(b'\0'):
+            if p:
+                yield os.fsdecode(p)
+
+    def walk(self):
+        """
+        Yield (path, relative) for every staged file below the root, whether
+        or not it's still present in the working tree.
+        """
+
+        for p in self.tracked():
+            yield (os.path.join(self.root, p), '/' + p)
+
+
+class BlobReader:
+    """
+    Reads the staged content of files from the index, through a single
+    `git cat-file --batch` process which is started when first needed.
+
+    Reading is serialized, so a reader can be shared between threads, and a
+    reader sent to another process starts its own `git cat-file`.
+
+    The last blob read by each thread is kept, since checking a file can read
+    its beginning several times.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.process = None
+        self.lock = threading.Lock()
+        # (path, data) of the last blob read by the current thread
+        self.local = threading.local()
+
+    def __getstate__(self):
+        return {'root': self.root}
+
+    def __setstate__(self, state):
+        # share one process per root in workers, rather than one per batch.
+        reader = WORKER_READERS.get(state['root'])
+
+        if reader is None:
+            reader = WORKER_READERS[state['root']] = BlobReader(state['root'])
+
+        self.__dict__ = reader.__dict__
+
+    def read(self, path, max_size=None):
+        """
+        Read the staged content of the file at the given path.
+
+        Raises SkippedFile for blobs larger than max_size, which are skipped
+        without being buffered.
+        """
+
+        last = getattr(self.local, 'last', None)
+
+        if last is not None and last[0] == path:
+            return last[1]
+
+        # relative to the current directory of git.
+        name = './' + os.path.relpath(path, self.root).replace(os.sep, '/')
+
+        if '\n' in name:
+            raise OSError(errno.EINVAL, 'Unsupported path', path)
+
+        with self.lock:
+            if self.process is None:
+                import subprocess
+
+                self.process = subprocess.Popen(
+                    ['git', 'cat-file', '--batch'], cwd=self.root,
+                    stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+            self.process.stdin.write(os.fsencode(':' + name) + b'\n')
+            self.process.stdin.flush()
+
+            header = self.process.stdout.readline()
+            parts = header.split()
+
+            if len(parts) != 3:
+                raise OSError(errno.ENOENT, 'Not in the index', path)
+
+            size = int(parts[2])
+
+            if max_size is not None and size > max_size:
+                self.drain(size + 1)
+                check_size(path, size, max_size)
+
+            data = self.process.stdout.read(size)
+            # trailing newline
+            self.process.stdout.read(1)
+
+        self.local.last = (path, data)
+        return data
+
+    def drain(self, size):
+        """
+        Skip the given number of bytes of output.
+        """
+
+        while size > 0:
+            block = self.process.stdout.read(min(size, DRAIN_SIZE))
+
+            if not block:
+                break
+
+            size -= len(block)
+
+    def read_head(self, path, limit, max_line=MAX_HEADER_LINE, max_size=None):
+        """
+        Like read_head, but reading the staged content of the file.
+        """
+
+        data = self.read(path, max_size)
+        check_size(path, len(data), max_size)
+        return read_lines(
+            io.BufferedReader(io.BytesIO(data)), path, limit, max_line)
+
+    def read_prefix(self, path, size, max_size=None):
+        """
+        Like read_prefix, but reading the staged content of the file.
+        """
+
+        data = self.read(path, max_size)
+        check_size(path, len(data), max_size)
+        data = data[:max(size, SNIFF_SIZE)]
+        sniff(path, data[:SNIFF_SIZE])
+        return data
+
+    def close(self):
+        self.local = threading.local()
+
+        if self.process is not None:
+            self.process.stdin.close()
+            self.process.wait()
+            self.process.stdout.close()
+            self.process = None
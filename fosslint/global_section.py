@@ -1,6 +1,10 @@
 import datetime
 
 from .licenses import load_license
+from .utils import parse_size
+
+# files larger than this are skipped, unless configured otherwise.
+MAX_FILE_SIZE = 10 * 1024 * 1024
 
 class GlobalSection:
     def __init__(self, context):
@@ -15,6 +19,8 @@ class GlobalSection:
         self.license_header = None
         self.license_header_path = None
         self.license_header_pad = None
+        self.max_file_size = MAX_FILE_SIZE
+        self.report_skipped_files = False
 
     def set_expect_license(self, name):
         self._expect_license = load_license(name)
@@ -24,7 +30,12 @@ class GlobalSection:
 
     expect_license = property(get_expect_license, set_expect_license)
 
-    def parse_section(self, section):
+    def parse_section(self, section, directory=''):
+        """
+        Parse the given section, where relative paths are relative to the
+        given directory of the project.
+        """
+
         expect_license = section.get('expect_license')
 
         if expect_license:
@@ -70,13 +81,24 @@ class GlobalSection:
 
         if license_header_path:
             self.license_header_path = self._context.load_license_header_path(
-                self._context.absolute_path(license_header_path))
+                self._context.absolute_path(license_header_path, directory))
 
         license_header_pad = section.get('license_header_pad')
 
         if license_header_pad:
             self.license_header_pad = license_header_pad
 
+        max_file_size = section.get('max_file_size')
+
+        if max_file_size:
+            # zero disables the limit.
+            self.max_file_size = parse_size(max_file_size) or None
+
+        report_skipped_files = section.getboolean('report_skipped_files')
+
+        if report_skipped_files is not None:
+            self.report_skipped_files = report_skipped_files
+
     def verify(self):
         if self.entity is None:
             raise Exception('Missing option \'entity\'')
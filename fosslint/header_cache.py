@@ -0,0 +1,82 @@
+class RenderedHeader:
+    """
+    A license header rendered as the comment expected in a file.
+    """
+
+    __slots__ = ('lines', 'encoded', 'encoded_crlf')
+
+    def __init__(self, lines):
+        self.lines = tuple(lines)
+        # the header as it is expected to be found in a file, see
+        # CompiledOptions.match_header_bytes
+        self.encoded = u''.join(l + u'\n' for l in self.lines).encode('utf-8')
+        self.encoded_crlf = self.encoded.replace(b'\n', b'\r\n')
+
+    def __len__(self):
+        return len(self.lines)
+
+    def __iter__(self):
+        return iter(self.lines)
+
+
+class HeaderCache:
+    """
+    Cache of rendered headers.
+
+    Headers are keyed on the signature of the extension rendering them, the
+    license text, and the variables used to render it. There's typically only
+    a handful of distinct headers in a project.
+    """
+
+    def __init__(self):
+        self.headers = dict()
+        # accepted headers, see trie
+        self.tries = dict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, ext, license_header, kw):
+        key = (ext.header_signature(), license_header,
+               tuple(sorted(kw.items())))
+
+        try:
+            header = self.headers[key]
+        except KeyError:
+            self.misses += 1
+        else:
+            self.hits += 1
+            return header
+
+        header = RenderedHeader(ext.render_header_comment(
+            license_header.render(**kw)
+        ))
+
+        self.headers[key] = header
+        return header
+
+    def trie(self, ext, license_header, accepted, kw):
+        """
+        Build a trie of the license header together with the accepted
+        headers, which are (name, license text) pairs.
+
+        The license header is rendered like in render, while placeholders in
+        accepted headers match anything.
+        """
+
+        # only needed with accepted headers
+        from .header_trie import HeaderTrie
+        from .header_trie import render_wildcards
+
+        key = (ext.header_signature(), license_header, accepted,
+               tuple(sorted(kw.items())))
+
+        trie = self.tries.get(key)
+
+        if trie is None:
+            trie = self.tries[key] = HeaderTrie()
+            trie.add('license_header', self.render(ext, license_header, kw))
+
+            for name, text in accepted:
+                trie.add(name, render_wildcards(ext, text))
+
+        return trie
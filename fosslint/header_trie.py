@@ -0,0 +1,179 @@
+import re
+
+# placeholders of a license text which match anything in an accepted header.
+WILDCARDS = ('year', 'entity')
+
+
+class Wildcard:
+    """
+    A header line with placeholders, which match any non-empty text.
+    """
+
+    __slots__ = ('text', 'expression')
+
+    def __init__(self, text, expression):
+        # the line as displayed, like `# Copyright {year} {entity}`
+        self.text = text
+        self.expression = expression
+
+    def match(self, line):
+        return self.expression.match(line) is not None
+
+
+def render_wildcards(ext, license_header):
+    """
+    Render a license header as a comment, where lines with placeholders
+    become a Wildcard.
+    """
+
+    markers = dict((name, '\0' + name + '\0') for name in WILDCARDS)
+    split = re.compile('\0(' + '|'.join(WILDCARDS) + ')\0')
+
+    for line in ext.render_header_comment(license_header.render(**markers)):
+        parts = split.split(line)
+
+        if len(parts) == 1:
+            yield line
+            continue
+
+        # every other part is the name of a placeholder.
+        text = ''.join(
+            p if i % 2 == 0 else '{' + p + '}' for i, p in enumerate(parts))
+        expression = ''.join(
+            re.escape(p) if i % 2 == 0 else '.+'
+            for i, p in enumerate(parts))
+
+        yield Wildcard(text, re.compile(expression + r'\Z'))
+
+
+class TrieNode:
+    __slots__ = ('exact', 'wildcards', 'end')
+
+    def __init__(self):
+        # line -> node
+        self.exact = dict()
+        # text -> (wildcard, node)
+        self.wildcards = dict()
+        # index of the first variant which ends at this node, if any
+        self.end = None
+
+    def children(self):
+        for node in self.exact.values():
+            yield node
+
+        for _, node in self.wildcards.values():
+            yield node
+
+    def advance(self, line):
+        node = self.exact.get(line)
+
+        if node is not None:
+            yield node
+
+        for wildcard, node in self.wildcards.values():
+            if wildcard.match(line):
+                yield node
+
+
+class HeaderTrie:
+    """
+    Several accepted headers, as a trie of their lines.
+
+    Lines are either plain strings, which have to match exactly, or a
+    Wildcard. Classifying a header against every variant is a single pass
+    over its lines.
+    """
+
+    def __init__(self):
+        self.root = TrieNode()
+        # names of variants, in order of preference
+        self.names = []
+        # lines of each variant
+        self.variants = []
+
+    @property
+    def depth(self):
+        return max(len(lines) for lines in self.variants)
+
+    def add(self, name, lines):
+        lines = list(lines)
+        index = len(self.names)
+        self.names.append(name)
+        self.variants.append(lines)
+
+        node = self.root
+
+        for line in lines:
+            if isinstance(line, Wildcard):
+                entry = node.wildcards.get(line.text)
+
+                if entry is None:
+                    entry = node.wildcards[line.text] = (line, TrieNode())
+
+                node = entry[1]
+            else:
+                node = node.exact.setdefault(line, TrieNode())
+
+        if node.end is None:
+            node.end = index
+
+    def text(self, index, line):
+        """
+        Get the given line of a variant as displayed.
+        """
+
+        line = self.variants[index][line]
+
+        if isinstance(line, Wildcard):
+            return line.text
+
+        return line
+
+    def classify(self, lines, skipped=None):
+        """
+        Classify the given header lines.
+
+        Like a single expected header, lines are only compared as long as
+        both the header and a variant have lines left, and lines for which
+        skipped returns true match anything.
+
+        Returns (True, variant, None) for the first variant which matches,
+        or (False, variant, line) where variant is the closest variant, which
+        matched the most lines before the mismatch at line.
+        """
+
+        active = [self.root]
+
+        for i, line in enumerate(lines):
+            ended = [node.end for node in active if node.end is not None]
+
+            if ended:
+                return (True, min(ended), None)
+
+            following = []
+
+            for node in active:
+                if skipped is not None and skipped(i):
+                    following.extend(node.children())
+                else:
+                    following.extend(node.advance(line))
+
+            if not following:
+                return (False, min(self.passing(active)), i)
+
+            active = following
+
+        return (True, min(self.passing(active)), None)
+
+    def passing(self, nodes):
+        """
+        Get the indexes of every variant which passes through the given
+        nodes.
+        """
+
+        for node in nodes:
+            if node.end is not None:
+                yield node.end
+
+            for index in self.passing(node.children()):
+                yield index
@@ -0,0 +1,94 @@
+import ctypes
+import errno
+import os
+import struct
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+
+# struct inotify_event, which is followed by a NUL padded name.
+EVENT = struct.Struct('iIII')
+# size of the buffer events are read into.
+READ_SIZE = 64 * 1024
+
+
+class Event:
+    def __init__(self, wd, mask, cookie, name):
+        self.wd = wd
+        self.mask = mask
+        self.cookie = cookie
+        self.name = name
+
+
+class Inotify:
+    """
+    Minimal wrapper around the Linux inotify API, using ctypes.
+    """
+
+    def __init__(self):
+        libc = ctypes.CDLL(None, use_errno=True)
+
+        if not hasattr(libc, 'inotify_init1'):
+            raise Exception('Watching requires inotify, which is only '
+                            'available on Linux')
+
+        self.libc = libc
+        self.fd = self.call(libc.inotify_init1, IN_CLOEXEC)
+
+    def call(self, f, *args):
+        result = f(*args)
+
+        if result < 0:
+            e = ctypes.get_errno()
+            raise OSError(e, os.strerror(e))
+
+        return result
+
+    def fileno(self):
+        return self.fd
+
+    def add_watch(self, path, mask):
+        """
+        Watch the given path, returning its watch descriptor.
+        """
+
+        return self.call(
+            self.libc.inotify_add_watch, self.fd, os.fsencode(path), mask)
+
+    def rm_watch(self, wd):
+        try:
+            self.call(self.libc.inotify_rm_watch, self.fd, wd)
+        except OSError as e:
+            # already removed, since the directory no longer exists.
+            if e.errno != errno.EINVAL:
+                raise
+
+    def read(self):
+        """
+        Read the events which are available, blocks if there are none.
+        """
+
+        data = os.read(self.fd, READ_SIZE)
+        events = []
+        offset = 0
+
+        while offset < len(data):
+            wd, mask, cookie, length = EVENT.unpack_from(data, offset)
+            offset += EVENT.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            events.append(Event(wd, mask, cookie, os.fsdecode(name)))
+
+        return events
+
+    def close(self):
+        os.close(self.fd)
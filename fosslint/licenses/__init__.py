@@ -1,5 +1,3 @@
-import pkg_resources
-
 class License:
     def __init__(self, full, header):
         self.full = full
@@ -19,11 +17,30 @@ LICENSES = {}
 
 LICENSES['Apache 2.0'] = License('apache_2.0.txt', 'apache_2.0_header.txt')
 
+# license texts which have already been read, by path.
+TEXTS = {}
+
 
 def read_license(path):
-    content = pkg_resources.resource_string(__name__, path).decode('utf-8')
+    """
+    Read a packaged license text, which is only read once.
+    """
+
+    try:
+        return TEXTS[path]
+    except KeyError:
+        pass
+
+    # importing this is comparatively slow, and not needed unless a packaged
+    # license is used.
+    import importlib.resources
+
+    resource = importlib.resources.files(__name__).joinpath(path)
+    content = resource.read_bytes().decode('utf-8')
     content = content.split(u'\n')
-    return LicenseText(content)
+
+    text = TEXTS[path] = LicenseText(content)
+    return text
 
 
 def load_license_header_path(path):
@@ -1,5 +1,42 @@
 import re
 
+def _compile_section(section):
+    parts = section.split('/')
+    results = []
+
+    for p in parts:
+        if p == '**':
+            results.append('.*')
+            continue
+
+        results.append('[^/]+'.join(re.escape(s) for s in p.split('*')))
+
+    return results
+
+
+def _anchor(pattern, expression):
+    # only require a full match if pattern is absolute
+    if pattern.startswith('/'):
+        return re.compile('^' + expression + '$')
+
+    return re.compile(expression + '$')
+
+
+class PathGlob:
+    """
+    Tests if any of a list of expressions matches a path.
+
+    This is a plain object (rather than a closure) so that compiled patterns
+    can be pickled, see ConfigCache.
+    """
+
+    def __init__(self, expressions):
+        self.expressions = expressions
+
+    def __call__(self, string):
+        return any(r.search(string) is not None for r in self.expressions)
+
+
 def pathglob_compile(pattern):
     """
     Implements a strict pattern matching algorithm suitable for file paths.
@@ -15,24 +52,137 @@ def pathglob_compile(pattern):
     expressions = []
 
     for section in sections:
-        parts = section.split('/')
-        results = []
+        results = _compile_section(section)
+        expressions.append(_anchor(pattern, '/'.join(results)))
 
-        for p in parts:
-            if p == '**':
-                results.append('.*')
-                continue
+    return PathGlob(expressions)
 
-            results.append('[^/]+'.join(re.escape(s) for s in p.split('*')))
 
-        # only require a full match if pattern is absolute
-        if pattern.startswith('/'):
-            expressions.append(re.compile('^' + '/'.join(results) + '$'))
+def pathglob_rebase(pattern, directory):
+    """
+    Make the given pattern relative to a directory (like `/src`), so that it
+    only matches paths below it.
+
+    Absolute sections are relative to the directory, while other sections
+    match at any depth below it.
+    """
+
+    sections = []
+
+    for section in pattern.split('|'):
+        if section.startswith('/'):
+            sections.append(directory + section)
         else:
-            expressions.append(re.compile('/'.join(results) + '$'))
+            sections.append(directory + '/' + section)
+            sections.append(directory + '/**/' + section)
+
+    return '|'.join(sections)
+
+
+def pathglob_covers(pattern):
+    """
+    Build a function that tests if the given pattern matches every path below
+    a directory, in which case the directory doesn't have to be visited.
+
+    Only sections that end with `/**` can cover a directory, the directory
+    must then match everything that precedes it.
+    """
+
+    sections = pattern.split('|')
+    expressions = []
+
+    for section in sections:
+        results = _compile_section(section)
+
+        if len(results) < 2 or section.split('/')[-1] != '**':
+            continue
+
+        expressions.append(_anchor(pattern, '/'.join(results[:-1])))
+
+    return PathGlob(expressions)
+
+
+def _extension(name):
+    """
+    Get the extension of the last component of a path, if any.
+    """
+
+    name = name.rsplit('/', 1)[-1]
+
+    if '.' not in name:
+        return None
+
+    return name.rsplit('.', 1)[1]
+
+
+class PathGlobSet:
+    """
+    A set of path globs which can be matched against a path at once.
+
+    Sections are bucketed by the literal extension of their last component
+    (as in `*.py`), so only the sections which can possibly match a path are
+    tested. Sections without a literal extension are always tested.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        # extension -> [(index, expression)]
+        self.buckets = dict()
+        # [(index, expression)] for sections without a literal extension
+        self.generic = []
+
+        for index, pattern in enumerate(self.patterns):
+            for section in pattern.split('|'):
+                results = _compile_section(section)
+                expression = _anchor(pattern, '/'.join(results))
+                extension = self.literal_extension(section)
+
+                if extension is None:
+                    self.generic.append((index, expression))
+                else:
+                    self.buckets.setdefault(extension, []).append(
+                        (index, expression))
+
+        # generic sections apply to every bucket.
+        for extension, bucket in self.buckets.items():
+            bucket.extend(self.generic)
+
+    @staticmethod
+    def literal_extension(section):
+        last = section.rsplit('/', 1)[-1]
+        extension = _extension(last)
+
+        if extension is None or '*' in extension or len(extension) == 0:
+            return None
+
+        return extension
+
+    def candidates(self, path):
+        return self.buckets.get(_extension(path), self.generic)
+
+    def matches(self, path):
+        """
+        Get the ordered list of indexes of all patterns that match the path.
+        """
+
+        found = set()
+
+        for index, expression in self.candidates(path):
+            if index in found:
+                continue
+
+            if expression.search(path) is not None:
+                found.add(index)
+
+        return sorted(found)
+
+    def any(self, path):
+        """
+        Check if any pattern matches the given path.
+        """
 
-    def search(string):
-        result = any(r.search(string) is not None for r in expressions)
-        return result
+        for _, expression in self.candidates(path):
+            if expression.search(path) is not None:
+                return True
 
-    return search
+        return False
@@ -1,4 +1,54 @@
+import copy
+
 from .pathglob import pathglob_compile
+from .pathglob import pathglob_rebase
+
+# highest line of a header which is part of skip-lines bitmaps, which keeps
+# them small. Lines past it are matched against their ranges instead.
+MAX_SKIP_LINE = 4095
+
+
+class LineRanges:
+    """
+    Matches line numbers against a set of inclusive ranges.
+
+    This is a plain object (rather than a closure) so that options referencing
+    it can be sent to worker processes.
+    """
+
+    def __init__(self, ranges):
+        self.ranges = ranges
+
+    def __call__(self, line):
+        for (start, end) in self.ranges:
+            if line >= start and line <= end:
+                return True
+
+        return False
+
+    def bitmap(self, limit=MAX_SKIP_LINE):
+        """
+        Convert the ranges to a bitmap, where bit i is set if line i matches,
+        for lines up to limit.
+        """
+
+        bitmap = 0
+
+        for (start, end) in self.ranges:
+            end = min(end, limit)
+
+            if end >= start:
+                bitmap |= (1 << (end + 1)) - (1 << start)
+
+        return bitmap
+
+    def beyond(self, limit=MAX_SKIP_LINE):
+        """
+        Get the parts of the ranges which are past limit, see bitmap.
+        """
+
+        return tuple((max(start, limit + 1), end)
+                     for (start, end) in self.ranges if end > limit)
 
 
 def parse_lines(input):
@@ -16,19 +66,25 @@ def parse_lines(input):
             f, t = int(r[0]), int(r[1])
             ranges.append((f, t))
 
-    def m(line):
-        for (start, end) in ranges:
-            if line >= start and line <= end:
-                return True
+    return LineRanges(ranges)
 
-        return False
 
-    return m
+def split_list(input):
+    """
+    Split a comma or newline separated list.
+    """
+
+    if not input:
+        return []
+
+    items = (i.strip() for i in input.replace('\n', ',').split(','))
+    return [i for i in items if i]
 
 
 class PatternSection:
     def __init__(self, pattern, **kw):
         self.pattern = pattern
+        self.glob = kw.get('glob', None)
         self.license_header = kw.get('license_header', None)
         self.license_header_path = kw.get('license_header_path', None)
         self.start_comment = kw.get('start_comment', None)
@@ -38,9 +94,26 @@ class PatternSection:
         self.strip_license = kw.get('strip_license', None)
         self.language = kw.get('language', None)
         self.license_header_pad = kw.get('license_header_pad', None)
+        # (name, license text) of other headers which are accepted
+        self.accepted_headers = kw.get('accepted_headers', None)
+
+    def rebase(self, directory):
+        """
+        Copy this section, so that its pattern is relative to the given
+        directory (like `/src`).
+        """
+
+        if not directory:
+            return self
+
+        section = copy.copy(self)
+        section.glob = pathglob_rebase(self.glob, directory)
+        section.pattern = pathglob_compile(section.glob)
+        return section
 
     @classmethod
-    def build(cls, context, pattern, **kw):
+    def build(cls, context, pattern, directory='', **kw):
+        kw['glob'] = pattern
         pattern = pathglob_compile(pattern)
 
         license_header = kw.get('license_header', None)
@@ -52,7 +125,20 @@ class PatternSection:
 
         if license_header_path:
             kw['license_header_path'] = context.load_license_header_path(
-                context.absolute_path(license_header_path))
+                context.absolute_path(license_header_path, directory))
+
+        accepted_headers = []
+
+        for name in split_list(kw.pop('accept_license_header', None)):
+            accepted_headers.append(
+                (name, context.load_license_header(name)))
+
+        for path in split_list(kw.pop('accept_license_header_path', None)):
+            accepted_headers.append((path, context.load_license_header_path(
+                context.absolute_path(path, directory))))
+
+        if accepted_headers:
+            kw['accepted_headers'] = tuple(accepted_headers)
 
         skip_header_lines = kw.get('skip_header_lines', None)
 
@@ -62,7 +148,7 @@ class PatternSection:
         return PatternSection(pattern, **kw)
 
     @classmethod
-    def parse(cls, context, name, section):
+    def parse(cls, context, name, section, directory=''):
         if not name.startswith('pattern:'):
             raise Exception('Expected pattern section')
 
@@ -77,8 +163,10 @@ class PatternSection:
         strip_license = section.getboolean('strip_license')
         language = section.get('language')
         license_header_pad = section.get('license_header_pad')
+        accept_license_header = section.get('accept_license_header')
+        accept_license_header_path = section.get('accept_license_header_path')
 
-        return cls.build(context, pattern,
+        return cls.build(context, pattern, directory,
             license_header = license_header,
             license_header_path = license_header_path,
             start_comment = start_comment,
@@ -88,4 +176,6 @@ class PatternSection:
             strip_license = strip_license,
             language = language,
             license_header_pad = license_header_pad,
+            accept_license_header = accept_license_header,
+            accept_license_header_path = accept_license_header_path,
         )
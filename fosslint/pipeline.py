@@ -0,0 +1,42 @@
+from .file_match_options import FileMatchOptions
+
+
+def match_files(files, resolve, stats=None):
+    """
+    Resolve the options of every file that isn't ignored and matches at least
+    one pattern section.
+
+    files is an iterable of (path, relative), as produced by a walker, and
+    options are yielded in the same order. resolve is called with the
+    directory of each file, and returns the project which applies to it.
+
+    Files matching the same pattern sections share compiled options, see
+    Project.compile.
+    """
+
+    for (path, relative) in files:
+        if stats:
+            stats.count('files seen')
+
+        project = resolve(relative.rsplit('/', 1)[0])
+
+        # is the file ignored
+        if project.ignore_set.any(relative):
+            if stats:
+                stats.count('files ignored')
+
+            continue
+
+        patterns = project.patterns
+        matches = project.matcher.matches(relative)
+
+        if len(matches) == 0:
+            continue
+
+        if stats:
+            stats.count('files matched')
+
+            for index in matches:
+                stats.count('files matched by pattern:' + patterns[index].glob)
+
+        yield FileMatchOptions(project.compile(matches), relative, path)
@@ -0,0 +1,250 @@
+import configparser
+import copy
+import os
+import sys
+
+from .cache import CACHE_DIR
+from .config import Config
+from .context import Context
+from .file_match_options import CompiledOptions
+from .global_section import GlobalSection
+from .pathglob import PathGlobSet
+from .pathglob import pathglob_covers
+from .pathglob import pathglob_rebase
+from .pattern_section import PatternSection
+from .pipeline import match_files
+from .policies import load_policy
+from .utils import file_digest
+
+ETC="/etc/fosslint.conf"
+DOTFILE=".fosslint"
+
+
+def config_paths(root):
+    """
+    Paths to all configuration files that apply to the given project, in the
+    order they are read.
+    """
+
+    home = os.path.join(os.path.expanduser('~'), DOTFILE)
+    return [ETC, home, os.path.join(root, DOTFILE)]
+
+
+class Project:
+    """
+    The resolved configuration of a project, or of a directory in a project
+    with a configuration of its own.
+    """
+
+    def __init__(self, context, global_section, patterns, ignored, pruned,
+                 unverified=None, log=sys.stdout):
+        self.context = context
+        self.global_section = global_section
+        # pattern sections, in the order they apply
+        self.patterns = patterns
+        # raw ignore patterns
+        self.ignored = ignored
+        # functions testing if an entire directory is ignored
+        self.pruned = pruned
+        # the global section before it was verified, which nested
+        # configurations are layered on
+        self.unverified = unverified
+        self.log = log
+        self.ignore_set = PathGlobSet(ignored)
+        self.matcher = PathGlobSet(s.glob for s in patterns)
+        # relative directory -> project which applies to it, see resolve
+        self.directories = {'': self}
+        # tuple of matching pattern indexes -> compiled options, see compile
+        self.compiled = dict()
+
+    @property
+    def root(self):
+        return self.context.root
+
+    def resolve(self, directory):
+        """
+        Resolve the project which applies to files in the given directory
+        (like `/src`), which is this project unless the directory or one of
+        its parents has a configuration of its own.
+
+        Every directory is only looked up once, and the configuration of each
+        nested project is only loaded once.
+        """
+
+        project = self.directories.get(directory)
+
+        if project is not None:
+            return project
+
+        project = self.resolve(directory.rsplit('/', 1)[0])
+        path = os.path.join(self.root, directory.lstrip('/'), DOTFILE)
+
+        if os.path.isfile(path):
+            project = project.nested(directory, path)
+            self.context.stats.count('nested configs')
+
+        self.directories[directory] = project
+        return project
+
+    def compile(self, matches):
+        """
+        Compile the options of files matching the pattern sections at the
+        given indexes, which are compiled once per distinct set of matches.
+        """
+
+        signature = tuple(matches)
+        options = self.compiled.get(signature)
+
+        if options is None:
+            options = CompiledOptions(
+                self.global_section, [self.patterns[i] for i in signature])
+            self.compiled[signature] = options
+            self.context.stats.count('compiled options')
+
+        return options
+
+    def reset(self):
+        """
+        Forget all nested projects, so that they are loaded again.
+        """
+
+        self.directories = {'': self}
+
+    def nested(self, directory, path):
+        """
+        Load the configuration at path in the given directory, layered on top
+        of this project.
+        """
+
+        global_section = copy.copy(self.unverified)
+        patterns = list(self.patterns)
+        ignored = list(self.ignored)
+        pruned = list(self.pruned)
+
+        apply_config(
+            self.context, read_config([path]), global_section, patterns,
+            ignored, pruned, self.log, directory)
+
+        return build_project(
+            self.context, global_section, patterns, ignored, pruned, self.log)
+
+    def match_files(self, files):
+        """
+        Resolve the options of every file to check among the given
+        (path, relative) pairs.
+        """
+
+        stats = self.context.stats
+
+        return match_files(
+            files, self.resolve, stats if stats.enabled else None)
+
+
+def read_config(paths):
+    config_parser = configparser.RawConfigParser()
+
+    for c in paths:
+        if not os.path.isfile(c):
+            continue
+
+        config_parser.read(c)
+
+    return Config(config_parser)
+
+
+def apply_config(context, config, global_section, patterns, ignored, pruned,
+                 log, directory=''):
+    """
+    Apply the sections of a configuration.
+
+    Patterns and paths of the configuration are relative to the given
+    directory of the project (like `/src`).
+    """
+
+    for section in config.sections():
+        if section.startswith('policy:'):
+            _, name = section.split(':', 1)
+            section = config[section]
+            policy = load_policy(name, section)
+            print('Applying Policy: ' + policy.name, file=log)
+
+            added = []
+            policy.apply(context, global_section, added)
+            patterns.extend(p.rebase(directory) for p in added)
+            continue
+
+    for section in config.sections():
+        if section.startswith('policy:'):
+            # already applied
+            continue
+
+        if section == 'global':
+            global_section.parse_section(config[section], directory)
+            continue
+
+        if section.startswith('ignore:'):
+            _, rest = section.split(':', 1)
+
+            if directory:
+                rest = pathglob_rebase(rest, directory)
+
+            ignored.append(rest)
+            pruned.append(pathglob_covers(rest))
+            continue
+
+        if section.startswith('pattern:'):
+            pattern = PatternSection.parse(
+                context, section, config[section], directory)
+            patterns.append(pattern.rebase(directory))
+            continue
+
+        raise Exception('Unsupported section (' + section + ')')
+
+
+def build_project(context, global_section, patterns, ignored, pruned, log):
+    unverified = copy.copy(global_section)
+    global_section.verify()
+
+    return Project(context, global_section, patterns, ignored, pruned,
+                   unverified, log)
+
+
+def load_project(root, log=sys.stdout, stats=None, cache=None):
+    """
+    Load the configuration of the project at root.
+
+    Configurations in directories below the root are loaded as they are
+    needed, see Project.resolve.
+
+    If a ConfigCache is given, the configuration is loaded from it unless any
+    of the files it was loaded from have changed.
+    """
+
+    paths = config_paths(root)
+    inputs = dict((path, file_digest(path)) for path in paths)
+
+    if cache is not None:
+        project = cache.load(root, inputs, log, stats)
+
+        if project is not None:
+            return project
+
+    config = read_config(paths)
+
+    # patterns to ignore
+    ignored = []
+    # directories to ignore completely
+    pruned = [pathglob_covers('/' + CACHE_DIR + '/**')]
+    # patterns to evalute
+    patterns = []
+    # context for local configurations
+    context = Context(root, stats)
+    context.inputs.update(inputs)
+    # global configuration
+    global_section = GlobalSection(context)
+
+    apply_config(context, config, global_section, patterns, ignored, pruned,
+                 log)
+
+    return build_project(
+        context, global_section, patterns, ignored, pruned, log)
@@ -0,0 +1,203 @@
+import datetime
+import json
+import sys
+import urllib.parse
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+INFORMATION_URI = "http://github.com/udoprog/fosslint"
+
+
+def rule_id(kind):
+    return '-'.join(kind.lower().split())
+
+
+class Summary:
+    """
+    Summary of a run, passed to Reporter.finish.
+    """
+
+    def __init__(self, checks, violations, by_kind, elapsed, complete):
+        self.checks = checks
+        self.violations = violations
+        self.by_kind = by_kind
+        self.elapsed = elapsed
+        self.complete = complete
+
+
+class Reporter:
+    """
+    Base class for reporting violations as they are found.
+    """
+
+    def __init__(self, out):
+        self.out = out
+
+    def start(self):
+        pass
+
+    def violation(self, opt, e):
+        pass
+
+    def finish(self, summary):
+        pass
+
+    def close(self):
+        """
+        Called once reporting is done, whether or not the run finished.
+        """
+
+        pass
+
+
+class TextReporter(Reporter):
+    def violation(self, opt, e):
+        print("{}:{} - {}:".format(e.path, e.line, e.kind), file=self.out)
+        print("  {}".format(e.message), file=self.out)
+
+    def finish(self, summary):
+        if summary.violations == 0:
+            print("Performed {} check(s), no issues found :)".format(
+                summary.checks), file=self.out)
+
+
+class JsonLinesReporter(Reporter):
+    """
+    Writes one JSON object per line for each violation, followed by a summary.
+    """
+
+    def write(self, record):
+        self.out.write(json.dumps(record) + '\n')
+        self.out.flush()
+
+    def violation(self, opt, e):
+        self.write({
+            "type": "violation",
+            "path": e.path,
+            "relative": opt.relative,
+            "line": e.line,
+            "file_line": e.file_line,
+            "kind": e.kind,
+            "message": e.message,
+            "expected": e.expected,
+            "actual": e.actual,
+        })
+
+    def finish(self, summary):
+        self.write({
+            "type": "summary",
+            "checks": summary.checks,
+            "violations": summary.violations,
+            "by_kind": summary.by_kind,
+            "elapsed": summary.elapsed,
+            "complete": summary.complete,
+        })
+
+
+class SarifReporter(Reporter):
+    """
+    Writes a SARIF 2.1.0 log.
+
+    Results are written as they are found, and the log is completed once the
+    run finishes. If the run is aborted, the log is completed on close with
+    an invocation which wasn't successful.
+    """
+
+    def __init__(self, out):
+        super().__init__(out)
+        self.first = True
+        self.start_time = None
+        # the log has been started, but not completed
+        self.open = False
+
+    def start(self):
+        self.start_time = utc_now()
+
+        tool = {
+            "driver": {
+                "name": "fosslint",
+                "informationUri": INFORMATION_URI,
+            }
+        }
+
+        self.out.write('{"version": "2.1.0", "$schema": ' + json.dumps(
+            SARIF_SCHEMA) + ', "runs": [{"tool": ' + json.dumps(tool))
+        self.out.write(', "results": [')
+        self.open = True
+
+    def violation(self, opt, e):
+        result = {
+            "ruleId": rule_id(e.kind),
+            "level": "error",
+            "message": {"text": e.kind + ": " + e.message},
+            "locations": [{
+                "physicalLocation": {
+                    "artifactLocation": {
+                        "uri": urllib.parse.quote(opt.relative.lstrip('/')),
+                        "uriBaseId": "%SRCROOT%",
+                    },
+                    "region": {"startLine": e.file_line},
+                }
+            }],
+        }
+
+        if not self.first:
+            self.out.write(',')
+
+        self.first = False
+        self.out.write('\n' + json.dumps(result))
+        self.out.flush()
+
+    def finish(self, summary):
+        invocation = {
+            "executionSuccessful": True,
+            "startTimeUtc": self.start_time,
+            "endTimeUtc": utc_now(),
+        }
+
+        properties = {
+            "checks": summary.checks,
+            "violations": summary.violations,
+            "byKind": summary.by_kind,
+            "elapsed": summary.elapsed,
+            "complete": summary.complete,
+        }
+
+        self.complete(invocation, properties)
+
+    def close(self):
+        if not self.open:
+            return
+
+        invocation = {
+            "executionSuccessful": False,
+            "startTimeUtc": self.start_time,
+            "endTimeUtc": utc_now(),
+        }
+
+        self.complete(invocation, {"complete": False})
+
+    def complete(self, invocation, properties):
+        self.out.write('], "invocations": [' + json.dumps(invocation) + ']')
+        self.out.write(', "properties": ' + json.dumps(properties) + '}]}\n')
+        self.out.flush()
+        self.open = False
+
+
+def utc_now():
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return now.strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+REPORTERS = {}
+REPORTERS['text'] = TextReporter
+REPORTERS['jsonl'] = JsonLinesReporter
+REPORTERS['sarif'] = SarifReporter
+
+
+def load_reporter(name, out=None):
+    try:
+        reporter = REPORTERS[name]
+    except KeyError:
+        raise Exception('Unsupported format (' + name + ')')
+
+    return reporter(out if out is not None else sys.stdout)
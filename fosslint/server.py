@@ -0,0 +1,244 @@
+import json
+import os
+import socket
+import stat
+import time
+
+from .cache import CACHE_DIR
+from .cache import Cache
+from .executor import check_files
+from .git import ChangedWalker
+from .git import GitWalker
+from .project import config_paths
+from .project import load_project
+from .reporters import JsonLinesReporter
+from .reporters import Summary
+from .walker import PathWalker
+from .walker import Walker
+
+# requests and responses are a single JSON object per line.
+ENCODING = 'utf-8'
+# seconds without requests before the cache is saved, so that it isn't
+# rewritten for every request.
+SAVE_DELAY = 5.0
+# seconds a client may stall while sending a request or reading a response.
+CLIENT_TIMEOUT = 30.0
+
+
+def config_state(root):
+    """
+    Identify the state of the configuration files of a project, so that the
+    project can be loaded again when they change.
+    """
+
+    state = []
+
+    for path in config_paths(root):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+
+        state.append((path, st.st_mtime_ns, st.st_size))
+
+    return state
+
+
+class Server:
+    """
+    Answers check requests over a Unix socket, keeping the project, including
+    pattern matchers and rendered headers, in memory between requests.
+
+    A request is a single JSON object on one line:
+
+        {"root": <dir>, "paths": [<path>, ...], "since": <rev>,
+         "source": "walk" | "git", "jobs": <n>, "executor": <name>,
+         "no_cache": <bool>}
+
+    Where every key is optional. If neither paths nor since is present the
+    whole project is checked, and paths must be absolute. The remaining keys
+    correspond to the options of `fosslint check`, and default to the options
+    the server was started with.
+
+    The response is the output of --format jsonl, with one object per line
+    for each violation followed by a summary. If the request fails, a single
+    object with the type "error" and a message is sent instead.
+    """
+
+    def __init__(self, ns, log):
+        self.ns = ns
+        self.log = log
+        self.root = os.path.abspath(ns.root)
+        self.project = None
+        self.state = None
+        self.cache = None
+        # the cache has results which haven't been saved, see save
+        self.unsaved = False
+        # a request since the cache was saved has seen every file
+        self.complete = False
+
+        if not ns.no_cache:
+            self.cache = Cache.open(os.path.join(self.root, CACHE_DIR))
+
+    def load(self):
+        """
+        Load the project, unless its configuration is unchanged.
+        """
+
+        state = config_state(self.root)
+
+        if self.project is None or state != self.state:
+            self.project = load_project(self.root, self.log)
+            self.state = state
+        else:
+            # nested configurations might have changed.
+            self.project.reset()
+
+        return self.project
+
+    def walker(self, project, request):
+        if request.get('paths') is not None:
+            return PathWalker(self.root, request['paths'], project.pruned)
+
+        if request.get('since') is not None:
+            return ChangedWalker(self.root, request['since'])
+
+        if request.get('source', self.ns.source) == 'git':
+            return GitWalker(self.root)
+
+        return Walker(self.root, project.pruned)
+
+    def check(self, request, out):
+        start = time.monotonic()
+        root = request.get('root')
+
+        if root is not None and os.path.abspath(root) != self.root:
+            raise Exception('Server is serving another root: ' + self.root)
+
+        project = self.load()
+        context = project.context
+        walker = self.walker(project, request)
+        reporter = JsonLinesReporter(out)
+
+        opts = project.match_files(walker.walk())
+        jobs = request.get('jobs', self.ns.jobs)
+        executor = request.get('executor', self.ns.executor)
+        cache = None if request.get('no_cache') else self.cache
+
+        count = 0
+        violations = 0
+        by_kind = dict()
+
+        for opt, records in check_files(
+                context, opts, jobs, executor, cache):
+            count += 1
+
+            for e in (opt.bind(context, r) for r in records):
+                violations += 1
+                by_kind[e.kind] = by_kind.get(e.kind, 0) + 1
+                reporter.violation(opt, e)
+
+        if cache is not None:
+            self.unsaved = True
+            self.complete = self.complete or walker.complete
+
+        reporter.finish(Summary(
+            checks=count,
+            violations=violations,
+            by_kind=by_kind,
+            elapsed=time.monotonic() - start,
+            complete=walker.complete))
+
+    def save(self):
+        """
+        Save the cache, if any request has updated it since it was saved.
+        """
+
+        if not self.unsaved:
+            return
+
+        self.cache.save(complete=self.complete, log=self.log)
+        self.unsaved = False
+        self.complete = False
+
+    def handle(self, conn):
+        # a stalled client must not block every other client.
+        conn.settimeout(CLIENT_TIMEOUT)
+
+        with conn.makefile('r', encoding=ENCODING) as i, \
+                conn.makefile('w', encoding=ENCODING) as out:
+            try:
+                self.check(json.loads(i.readline()), out)
+            except Exception as e:
+                out.write(json.dumps({"type": "error", "message": str(e)}))
+                out.write('\n')
+
+    def serve(self, path):
+        sock = listen(path)
+        print('Serving {} on {}'.format(self.root, path), file=self.log)
+
+        try:
+            # requests are handled one at a time, so that the project and
+            # the cache are never shared between threads.
+            while True:
+                # the cache is saved once requests stop arriving.
+                sock.settimeout(SAVE_DELAY if self.unsaved else None)
+
+                try:
+                    conn, _ = sock.accept()
+                except socket.timeout:
+                    self.save()
+                    continue
+
+                with conn:
+                    try:
+                        self.handle(conn)
+                    except OSError:
+                        # client went away
+                        pass
+        finally:
+            self.save()
+            sock.close()
+            os.unlink(path)
+
+
+def listen(path):
+    """
+    Listen on a Unix socket at the given path, replacing a stale socket left
+    behind by a server which is no longer running.
+    """
+
+    if os.path.exists(path):
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            raise Exception('Not a socket: ' + path)
+
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+                s.connect(path)
+        except ConnectionRefusedError:
+            os.unlink(path)
+        else:
+            raise Exception('Server is already running on: ' + path)
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    try:
+        sock.bind(path)
+        os.chmod(path, 0o600)
+        sock.listen()
+    except:
+        sock.close()
+        raise
+
+    return sock
+
+
+def serve(ns, log):
+    server = Server(ns, log)
+
+    try:
+        server.serve(ns.socket)
+    except KeyboardInterrupt:
+        pass
+
+    return 0
@@ -0,0 +1,212 @@
+import contextlib
+import heapq
+import threading
+import time
+
+# number of slowest files reported.
+SLOWEST = 10
+
+
+class NullStats:
+    """
+    Instrumentation which doesn't record anything, used unless --stats is
+    given.
+    """
+
+    enabled = False
+
+    def snapshot(self):
+        return None
+
+    def phase(self, name):
+        return contextlib.nullcontext()
+
+    def timed(self, name, iterable):
+        return iterable
+
+    def file(self, relative):
+        return contextlib.nullcontext()
+
+    def count(self, name, n=1):
+        pass
+
+
+class Stats:
+    """
+    Instrumentation of the phases of a run.
+
+    Phase times are exclusive, so time spent in a nested phase is not counted
+    towards the phase containing it. Phases are tracked per thread, and times
+    are summed across all threads.
+
+    Extensions can report into this through context.stats.
+    """
+
+    enabled = True
+
+    def __init__(self, slowest=SLOWEST, worker=False):
+        self.slowest = slowest
+        # stats of a worker process, which are sent back through snapshot()
+        self.worker = worker
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        # name -> [wall, cpu]
+        self.phases = dict()
+        self.counters = dict()
+        # heap of (elapsed, relative) for the slowest files
+        self.files = []
+
+    def __getstate__(self):
+        # workers in other processes start with empty stats, which are merged
+        # back through snapshot() and merge().
+        return {'slowest': self.slowest}
+
+    def __setstate__(self, state):
+        self.__init__(state['slowest'], worker=True)
+
+    def snapshot(self):
+        """
+        Take what has been recorded by a worker process, so that it can be
+        merged into the stats of the main process.
+
+        Returns None unless this is a worker process.
+        """
+
+        if not self.worker:
+            return None
+
+        with self.lock:
+            snapshot = (self.phases, self.counters, self.files)
+            self.phases = dict()
+            self.counters = dict()
+            self.files = []
+
+        return snapshot
+
+    def merge(self, snapshot):
+        phases, counters, files = snapshot
+
+        with self.lock:
+            for name, (wall, cpu) in phases.items():
+                totals = self.phases.setdefault(name, [0.0, 0.0])
+                totals[0] += wall
+                totals[1] += cpu
+
+            for name, value in counters.items():
+                self.counters[name] = self.counters.get(name, 0) + value
+
+            for entry in files:
+                if len(self.files) < self.slowest:
+                    heapq.heappush(self.files, entry)
+                else:
+                    heapq.heappushpop(self.files, entry)
+
+    def _stack(self):
+        stack = getattr(self.local, 'stack', None)
+
+        if stack is None:
+            stack = self.local.stack = []
+
+        return stack
+
+    def _switch(self, stack):
+        """
+        Attribute the time since the last switch to the current phase.
+        """
+
+        wall, cpu = time.perf_counter(), time.thread_time()
+
+        if len(stack) > 0:
+            name, start_wall, start_cpu = stack[-1]
+
+            with self.lock:
+                totals = self.phases.setdefault(name, [0.0, 0.0])
+                totals[0] += wall - start_wall
+                totals[1] += cpu - start_cpu
+
+        return wall, cpu
+
+    def enter(self, name):
+        stack = self._stack()
+        wall, cpu = self._switch(stack)
+        stack.append((name, wall, cpu))
+
+    def exit(self):
+        stack = self._stack()
+        self._switch(stack)
+        stack.pop()
+
+        # resume the outer phase.
+        if len(stack) > 0:
+            name, _, _ = stack.pop()
+            stack.append((name, time.perf_counter(), time.thread_time()))
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        self.enter(name)
+
+        try:
+            yield
+        finally:
+            self.exit()
+
+    def timed(self, name, iterable):
+        """
+        Time spent producing each item of the given iterable as a phase.
+        """
+
+        it = iter(iterable)
+
+        while True:
+            self.enter(name)
+
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+            finally:
+                self.exit()
+
+            yield item
+
+    @contextlib.contextmanager
+    def file(self, relative):
+        """
+        Time how long it takes to check a single file.
+        """
+
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+
+            with self.lock:
+                if len(self.files) < self.slowest:
+                    heapq.heappush(self.files, (elapsed, relative))
+                else:
+                    heapq.heappushpop(self.files, (elapsed, relative))
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def report(self, out):
+        print('Phases (wall / cpu):', file=out)
+
+        for name, (wall, cpu) in sorted(
+                self.phases.items(), key=lambda e: -e[1][0]):
+            print('  {:12} {:10.3f}s {:10.3f}s'.format(name, wall, cpu),
+                  file=out)
+
+        print('Counters:', file=out)
+
+        for name, value in sorted(self.counters.items()):
+            print('  {}: {}'.format(name, value), file=out)
+
+        if len(self.files) > 0:
+            print('Slowest files:', file=out)
+
+            for elapsed, relative in sorted(self.files, reverse=True):
+                print('  {:10.6f}s {}'.format(elapsed, relative), file=out)
@@ -1,4 +1,139 @@
+import codecs
+import hashlib
+import os
+
 LINEEND = '\n\r'
 
+# longest line (in bytes) that is read when looking for a header.
+MAX_HEADER_LINE = 4096
+# number of bytes at the beginning of a file used to detect binary files.
+SNIFF_SIZE = 8192
+
+SIZE_SUFFIXES = {'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3}
+
 def strip_lineend(string):
     return string.rstrip(LINEEND)
+
+class SkippedFile(Exception):
+    """
+    Raised when a file shouldn't be checked, like binary or oversized files.
+    """
+
+    def __init__(self, kind, message):
+        super().__init__(message)
+        self.kind = kind
+
+def parse_size(value):
+    """
+    Parse a size in bytes, with an optional k, M or G suffix.
+    """
+
+    value = value.strip()
+    factor = SIZE_SUFFIXES.get(value[-1:].lower())
+
+    if factor is not None:
+        value = value[:-1]
+    else:
+        factor = 1
+
+    try:
+        return int(value) * factor
+    except ValueError:
+        raise Exception('Bad size: ' + value)
+
+def sniff(path, prefix):
+    """
+    Raise SkippedFile if the given prefix of a file looks binary, that is if
+    it contains NUL bytes.
+
+    Text which isn't valid UTF-8 (like Latin-1) is still checked, see
+    read_lines.
+    """
+
+    if b'\0' in prefix:
+        raise SkippedFile('Binary File', 'File contains NUL bytes: ' + path)
+
+def check_size(path, size, max_size):
+    """
+    Raise SkippedFile if the size of a file is larger than `max_size`.
+    """
+
+    if max_size is not None and size > max_size:
+        raise SkippedFile('File Too Large', (
+            'File is larger than max_file_size ({} > {}): {}'
+        ).format(size, max_size, path))
+
+def file_digest(path):
+    """
+    Get the SHA-1 of the content of a file, or None if it can't be read.
+    """
+
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except OSError:
+        return None
+
+def read_head(path, limit, max_line=MAX_HEADER_LINE, max_size=None):
+    """
+    Read at most `limit` lines from the beginning of the given file.
+
+    Lines longer than `max_line` are truncated, after which reading stops
+    since nothing past that point can be part of a header.
+
+    Before reading any lines, the size of the file is checked against
+    `max_size` and the first SNIFF_SIZE bytes are sniffed, raising
+    SkippedFile for oversized and binary files.
+    """
+
+    with open(path, 'rb') as f:
+        if max_size is not None:
+            check_size(path, os.fstat(f.fileno()).st_size, max_size)
+
+        return read_lines(f, path, limit, max_line)
+
+def read_prefix(path, size, max_size=None):
+    """
+    Read at most `size` bytes from the beginning of the given file, which is
+    checked like in read_head.
+
+    At least SNIFF_SIZE bytes are read (if available), since they are sniffed.
+    """
+
+    with open(path, 'rb') as f:
+        if max_size is not None:
+            check_size(path, os.fstat(f.fileno()).st_size, max_size)
+
+        data = f.read(max(size, SNIFF_SIZE))
+
+    sniff(path, data[:SNIFF_SIZE])
+    return data
+
+def read_lines(f, path, limit, max_line=MAX_HEADER_LINE):
+    """
+    Read at most `limit` lines from the buffered binary file f, see
+    read_head.
+    """
+
+    lines = []
+
+    # peek fills the buffer which lines are read from below, so the prefix is
+    # only read once.
+    sniff(path, f.peek(SNIFF_SIZE)[:SNIFF_SIZE])
+
+    # bytes which aren't valid UTF-8 are replaced, so that such lines never
+    # match an expected header but can still be reported.
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+    while len(lines) < limit:
+        line = f.readline(max_line)
+
+        if not line:
+            break
+
+        lines.append(decoder.decode(line))
+
+        if len(line) == max_line and not line.endswith(b'\n'):
+            break
+
+    return lines
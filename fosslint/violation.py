@@ -1,9 +1,77 @@
 class Violation:
+    """
+    A violation found in a file.
+
+    Violations are compact records, which refer to the options of the file
+    rather than holding on to its content. Diffs and fixes are regenerated
+    from the file on disk when they are needed.
+    """
+
+    __slots__ = ('path', 'line', 'message', 'kind', 'expected', 'actual',
+                 'offset', 'options')
+
     def __init__(self, path, line, **kw):
         self.path = path
         self.line = line
         self.message = kw.pop('message', 'No Error')
         self.kind = kw.pop('kind', 'UNKNOWN')
-        self.fix = kw.pop('fix', lambda: ())
-        self.describe_fix = kw.pop('describe_fix', lambda: "No Description")
-        self.diff = kw.pop('diff', None)
+        self.expected = kw.pop('expected', None)
+        self.actual = kw.pop('actual', None)
+        # zero-based line in the file that line is relative to
+        self.offset = kw.pop('offset', 0)
+        # the options which can fix this violation, if any
+        self.options = kw.pop('options', None)
+
+    @property
+    def file_line(self):
+        """
+        The one-based line number in the file of this violation.
+        """
+
+        return self.offset + self.line + 1
+
+    @property
+    def fixable(self):
+        return self.options is not None
+
+    def describe_fix(self):
+        if not self.fixable:
+            return "No Description"
+
+        return "Fix Header"
+
+    def diff(self, context):
+        """
+        Generate a unified diff of the fix for this violation.
+        """
+
+        if not self.fixable:
+            return iter(())
+
+        return self.options.diff(context, self.path)
+
+    def fix(self, context):
+        if self.fixable:
+            self.options.fix(context, self.path)
+
+
+class ViolationRecord:
+    """
+    Plain data describing a violation.
+
+    Records carry no references to options, so they can be produced by a
+    worker process and bound to the options in the process that owns them.
+    """
+
+    __slots__ = ('path', 'line', 'kind', 'message', 'range_index',
+                 'expected', 'actual')
+
+    def __init__(self, path, line, kind, message, range_index=None,
+                 expected=None, actual=None):
+        self.path = path
+        self.line = line
+        self.kind = kind
+        self.message = message
+        self.range_index = range_index
+        self.expected = expected
+        self.actual = actual
@@ -0,0 +1,158 @@
+import os
+
+
+class Walker:
+    """
+    Walks a directory tree using os.scandir.
+
+    Directories covered by a prune function (see pathglob_covers) are skipped
+    altogether, and every directory is only visited once as identified by its
+    (device, inode) which protects against symlink loops.
+
+    Symlinked directories are walked after all other directories, so that
+    files are reported under their real path when possible.
+
+    Files in a directory are listed before any of its subdirectories are
+    visited.
+    """
+
+    def __init__(self, root, prune=None, sort=True, base='', on_dir=None):
+        self.root = root
+        # relative path of the root, when walking part of a project
+        self.base = base
+        # called with (path, relative) for every directory visited
+        self.on_dir = on_dir
+        self.prune = list(prune) if prune else []
+        # sort the entries of each directory, so that files are listed in a
+        # deterministic order.
+        self.sort = sort
+        # directories which has been visited, as (device, inode)
+        self.visited = set()
+        # number of directories visited
+        self.dirs = 0
+        # number of directories pruned through ignore patterns
+        self.pruned = 0
+        # number of directories skipped since they have already been visited
+        self.duplicates = 0
+        # every file in the project is listed
+        self.complete = True
+
+    def is_pruned(self, relative):
+        return any(p(relative) for p in self.prune)
+
+    def enter(self, stat):
+        key = (stat.st_dev, stat.st_ino)
+
+        if key in self.visited:
+            self.duplicates += 1
+            return False
+
+        self.visited.add(key)
+        self.dirs += 1
+        return True
+
+    def walk(self):
+        """
+        Yield (path, relative) for every file below the root.
+        """
+
+        if self.is_pruned(self.base):
+            self.pruned += 1
+            return
+
+        if not self.enter(os.stat(self.root)):
+            return
+
+        queue = [(self.root, self.base)]
+        links = []
+
+        while len(queue) > 0 or len(links) > 0:
+            if len(queue) > 0:
+                (path, rel) = queue.pop()
+            else:
+                (path, rel) = links.pop()
+
+                if not self.enter(os.stat(path)):
+                    continue
+
+            if self.on_dir is not None:
+                self.on_dir(path, rel)
+
+            with os.scandir(path) as it:
+                entries = list(it)
+
+            if self.sort:
+                entries.sort(key=lambda e: e.name)
+
+            dirs = []
+
+            for entry in entries:
+                next_relative = rel + '/' + entry.name
+
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+
+                if not is_dir:
+                    yield (entry.path, next_relative)
+                    continue
+
+                if self.is_pruned(next_relative):
+                    self.pruned += 1
+                    continue
+
+                if entry.is_symlink():
+                    links.append((entry.path, next_relative))
+                    continue
+
+                if not self.enter(entry.stat()):
+                    continue
+
+                dirs.append((entry.path, next_relative))
+
+            # visit directories in order.
+            queue.extend(reversed(dirs))
+
+
+def iterate_files(root, prune=None, sort=True):
+    return Walker(root, prune, sort).walk()
+
+
+class PathWalker:
+    """
+    Lists the given paths, which are files or directories below the root.
+
+    Directories are walked, while paths outside of the root are skipped.
+    """
+
+    def __init__(self, root, paths, prune=None):
+        self.root = root
+        self.paths = paths
+        self.prune = prune
+        self.dirs = 0
+        self.pruned = 0
+        # only part of the project is listed
+        self.complete = False
+
+    def walk(self):
+        root = os.path.abspath(self.root)
+
+        for p in self.paths:
+            path = os.path.join(root, p)
+            relative = os.path.relpath(path, root)
+
+            if relative == os.curdir:
+                relative = ''
+            elif relative.startswith(os.pardir + os.sep):
+                continue
+            else:
+                relative = '/' + relative.replace(os.sep, '/')
+
+            if os.path.isdir(path):
+                walker = Walker(path, self.prune, base=relative)
+                yield from walker.walk()
+                self.dirs += walker.dirs
+                self.pruned += walker.pruned
+            elif os.path.isfile(path):
+                yield (path, relative)
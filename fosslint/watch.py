@@ -0,0 +1,312 @@
+import os
+import select
+
+from .cache import CACHE_DIR
+from .cache import Cache
+from .executor import check_files
+from .inotify import IN_CLOSE_WRITE
+from .inotify import IN_CREATE
+from .inotify import IN_DELETE
+from .inotify import IN_DONT_FOLLOW
+from .inotify import IN_IGNORED
+from .inotify import IN_ISDIR
+from .inotify import IN_MOVED_FROM
+from .inotify import IN_MOVED_TO
+from .inotify import IN_ONLYDIR
+from .inotify import IN_Q_OVERFLOW
+from .inotify import Inotify
+from .project import DOTFILE
+from .project import load_project
+from .walker import Walker
+
+# seconds without any events before a batch of changes is processed, so that
+# editors saving a burst of files only cause one check.
+DEBOUNCE = 0.2
+
+WATCH_MASK = (IN_CLOSE_WRITE | IN_CREATE | IN_DELETE | IN_MOVED_FROM
+              | IN_MOVED_TO | IN_ONLYDIR | IN_DONT_FOLLOW)
+
+
+def under(relative, directory):
+    return relative == directory or relative.startswith(directory + '/')
+
+
+class Changes:
+    """
+    A debounced batch of changes to the watched tree.
+    """
+
+    def __init__(self):
+        # relative -> path of files which have been created or modified
+        self.files = dict()
+        # relative paths of files which have been removed
+        self.removed = set()
+        # (path, relative) of directories which have been added
+        self.added_dirs = []
+        # relative paths of directories which have been removed
+        self.removed_dirs = []
+        # a configuration file has changed
+        self.reload = False
+        # events have been lost, everything has to be checked again
+        self.overflow = False
+
+    def __len__(self):
+        return (len(self.files) + len(self.removed) + len(self.added_dirs)
+                + len(self.removed_dirs) + self.reload + self.overflow)
+
+
+class Watch:
+    """
+    Watch a project, checking files again as they change.
+
+    Only violations which are new since the last check are reported, together
+    with violations which have been resolved.
+    """
+
+    def __init__(self, ns, reporter, log):
+        self.ns = ns
+        self.reporter = reporter
+        self.log = log
+        self.inotify = Inotify()
+        self.project = None
+        # wd -> (path, relative) of watched directories
+        self.dirs = dict()
+        # relative -> {(line, kind, message): violation}
+        self.violations = dict()
+
+    def load(self):
+        """
+        Load the configuration, returning False if it is broken.
+
+        A broken configuration keeps the previous one in use.
+        """
+
+        try:
+            self.project = load_project(self.ns.root, self.log)
+        except Exception as e:
+            if self.project is None:
+                raise
+
+            print('Failed to load configuration: {}'.format(e), file=self.log)
+            return False
+
+        return True
+
+    def add_dir(self, path, relative):
+        try:
+            wd = self.inotify.add_watch(path, WATCH_MASK)
+        except OSError:
+            # removed before it could be watched
+            return
+
+        self.dirs[wd] = (path, relative)
+
+    def remove_dirs(self, relative):
+        for wd, (_, r) in list(self.dirs.items()):
+            if under(r, relative):
+                self.inotify.rm_watch(wd)
+                del self.dirs[wd]
+
+    def walk(self, path, relative):
+        """
+        Walk and watch the given directory, returning the files in it.
+        """
+
+        walker = Walker(path, self.project.pruned, base=relative,
+                        on_dir=self.add_dir)
+
+        return walker.walk()
+
+    def check(self, files, cache=None):
+        """
+        Check the given files, returning the number of files checked.
+        """
+
+        context = self.project.context
+        opts = self.project.match_files(files)
+        count = 0
+
+        for opt, records in check_files(
+                context, opts, self.ns.jobs, self.ns.executor, cache):
+            count += 1
+            self.update(opt, [opt.bind(context, r) for r in records])
+
+        return count
+
+    def update(self, opt, violations):
+        """
+        Update the violations of a file, reporting the differences.
+        """
+
+        before = self.violations.pop(opt.relative, {})
+        after = dict(((e.line, e.kind, e.message), e) for e in violations)
+
+        for key, e in before.items():
+            if key not in after:
+                self.resolved(e)
+
+        for key, e in after.items():
+            if key not in before:
+                self.reporter.violation(opt, e)
+
+        if len(after) > 0:
+            self.violations[opt.relative] = after
+
+    def resolved(self, e):
+        print('{}:{} - Resolved {}'.format(e.path, e.line, e.kind),
+              file=self.log)
+
+    def forget(self, test):
+        """
+        Forget the violations of every file matching the given test, which
+        are reported as resolved.
+        """
+
+        for relative in [r for r in self.violations if test(r)]:
+            for e in self.violations.pop(relative).values():
+                self.resolved(e)
+
+    def check_all(self, cache=None):
+        """
+        Walk and check the entire project, watching every directory.
+        """
+
+        for wd in list(self.dirs):
+            self.inotify.rm_watch(wd)
+
+        self.dirs.clear()
+
+        before = set(self.violations)
+        files = list(self.walk(self.ns.root, ''))
+        count = self.check(files, cache)
+
+        seen = set(relative for _, relative in files)
+        self.forget(lambda r: r in before and r not in seen)
+        return count
+
+    def read_changes(self):
+        """
+        Block until something changes, then collect events until they have
+        stopped arriving for DEBOUNCE seconds.
+        """
+
+        changes = Changes()
+        timeout = None
+
+        while True:
+            ready, _, _ = select.select([self.inotify], [], [], timeout)
+
+            if not ready:
+                return changes
+
+            for event in self.inotify.read():
+                self.collect(changes, event)
+
+            if len(changes) > 0:
+                timeout = DEBOUNCE
+
+    def collect(self, changes, event):
+        if event.mask & IN_Q_OVERFLOW:
+            changes.overflow = True
+            return
+
+        if event.mask & IN_IGNORED:
+            self.dirs.pop(event.wd, None)
+            return
+
+        parent = self.dirs.get(event.wd)
+
+        if parent is None or not event.name:
+            return
+
+        path = os.path.join(parent[0], event.name)
+        relative = parent[1] + '/' + event.name
+
+        if event.name == DOTFILE:
+            changes.reload = True
+
+        if event.mask & IN_ISDIR:
+            if event.mask & (IN_CREATE | IN_MOVED_TO):
+                changes.added_dirs.append((path, relative))
+            else:
+                changes.removed_dirs.append(relative)
+
+            return
+
+        if event.mask & (IN_DELETE | IN_MOVED_FROM):
+            changes.files.pop(relative, None)
+            changes.removed.add(relative)
+        else:
+            changes.files[relative] = path
+            changes.removed.discard(relative)
+
+    def apply(self, changes):
+        """
+        Apply a batch of changes, returning the number of files checked.
+        """
+
+        if changes.reload or changes.overflow:
+            if changes.reload:
+                print('Configuration changed, checking everything',
+                      file=self.log)
+
+                if not self.load():
+                    return 0
+
+            return self.check_all()
+
+        for relative in changes.removed_dirs:
+            self.remove_dirs(relative)
+            self.forget(lambda r: under(r, relative))
+
+        self.forget(lambda r: r in changes.removed)
+
+        files = dict()
+
+        for path, relative in changes.added_dirs:
+            for path, relative in self.walk(path, relative):
+                files[relative] = path
+
+        for relative, path in changes.files.items():
+            if os.path.isfile(path):
+                files[relative] = path
+
+        return self.check((p, r) for r, p in sorted(files.items()))
+
+    def run(self):
+        self.load()
+
+        cache = None
+
+        if not self.ns.no_cache:
+            cache = Cache.open(os.path.join(self.ns.root, CACHE_DIR))
+
+        count = self.check_all(cache)
+
+        if cache is not None:
+            cache.save(log=self.log)
+
+        self.summary(count)
+
+        while True:
+            count = self.apply(self.read_changes())
+            self.summary(count)
+
+    def summary(self, count):
+        total = sum(len(v) for v in self.violations.values())
+
+        print('Checked {} file(s), {} violation(s) in total. Watching for '
+              'changes...'.format(count, total), file=self.log)
+
+
+def watch(ns, reporter, log):
+    watch = Watch(ns, reporter, log)
+
+    try:
+        watch.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watch.inotify.close()
+
+    return 0
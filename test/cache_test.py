@@ -0,0 +1,64 @@
+from fosslint.cache import Cache
+from fosslint.violation import ViolationRecord
+
+import io
+import os
+import tempfile
+
+from unittest import TestCase
+from unittest.mock import Mock
+
+class CacheTest(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.tmp.name, 'cache')
+
+        self.opt = Mock()
+        self.opt.relative = '/a.py'
+        self.opt.path = os.path.join(self.tmp.name, 'a.py')
+
+        with open(self.opt.path, 'w') as f:
+            f.write('import os\n')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_roundtrip(self):
+        cache = Cache.open(self.directory)
+        state = cache.state(self.opt, 'abc')
+        self.assertIsNone(cache.get(self.opt, state))
+
+        record = ViolationRecord(
+            self.opt.path, 0, 'Kind', 'Message', range_index=(0, 2))
+        cache.put(self.opt, state, [record])
+        cache.save()
+
+        cache = Cache.open(self.directory)
+        records = cache.get(self.opt, cache.state(self.opt, 'abc'))
+        self.assertEqual(1, len(records))
+        self.assertEqual('Message', records[0].message)
+        self.assertEqual((0, 2), records[0].range_index)
+
+        # different fingerprint
+        self.assertIsNone(cache.get(self.opt, cache.state(self.opt, 'def')))
+
+    def test_evict_unseen(self):
+        cache = Cache.open(self.directory)
+        cache.put(self.opt, cache.state(self.opt, 'abc'), [])
+        cache.save()
+
+        cache = Cache.open(self.directory)
+        cache.save(complete=False)
+        self.assertEqual(1, len(Cache.open(self.directory).entries))
+
+        cache.save()
+        self.assertEqual(0, len(Cache.open(self.directory).entries))
+
+    def test_save_failure(self):
+        # the cache directory can't be created below a file.
+        cache = Cache.open(os.path.join(self.opt.path, 'cache'))
+        cache.put(self.opt, cache.state(self.opt, 'abc'), [])
+
+        log = io.StringIO()
+        self.assertFalse(cache.save(log=log))
+        self.assertIn('Failed to save cache', log.getvalue())
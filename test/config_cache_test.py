@@ -0,0 +1,94 @@
+from fosslint.config_cache import ConfigCache
+from fosslint.extensions import load_extension
+from fosslint.project import load_project
+
+import io
+import os
+import tempfile
+
+from unittest import TestCase
+from unittest.mock import patch
+
+def write(root, path, content):
+    with open(os.path.join(root, path), 'w') as f:
+        f.write(content)
+
+class ConfigCacheTest(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.cache = ConfigCache(os.path.join(self.root, 'cache'))
+
+        write(self.root, '.fosslint', '[global]\nentity = Acme\nyear = 2016\n'
+              '[pattern:/**/*.py]\nlicense_header_path = header.txt\n'
+              '[ignore:/vendor/**]\n')
+        write(self.root, 'header.txt', 'Copyright {year} {entity}\n')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def load(self):
+        return load_project(self.root, io.StringIO(), cache=self.cache)
+
+    def test_roundtrip(self):
+        project = self.load()
+        self.assertFalse(self.cache.loaded)
+
+        opt, = project.match_files([('/src/a.py', '/src/a.py')])
+        ext = load_extension(project.context, opt.path, opt.options)
+        project.context.render_header(
+            ext, opt.options.effective_license_header(), opt.options.kw)
+        self.cache.save(project)
+
+        project = self.load()
+        self.assertTrue(self.cache.loaded)
+        self.assertEqual('Acme', project.global_section.entity)
+        self.assertTrue(project.ignore_set.any('/vendor/b.py'))
+        self.assertIs(project.context, project.global_section._context)
+        self.assertIs(project, project.resolve('/src'))
+
+        opt, = project.match_files([('/src/a.py', '/src/a.py')])
+        ext = load_extension(project.context, opt.path, opt.options)
+        header = project.context.render_header(
+            ext, opt.options.effective_license_header(), opt.options.kw)
+        self.assertEqual(['# Copyright 2016 Acme'], list(header))
+        self.assertEqual(1, project.context.headers.hits)
+
+    def test_invalidated(self):
+        self.cache.save(self.load())
+
+        write(self.root, 'header.txt', 'Copyright {entity}\n')
+        self.load()
+        self.assertFalse(self.cache.loaded)
+
+        self.cache.save(self.load())
+
+        write(self.root, '.fosslint', '[global]\nentity = Other\n')
+        project = self.load()
+        self.assertFalse(self.cache.loaded)
+        self.assertEqual('Other', project.global_section.entity)
+
+    def test_private(self):
+        self.cache.save(self.load())
+
+        os.chmod(self.cache.path, 0o666)
+        self.load()
+        self.assertFalse(self.cache.loaded)
+
+        os.chmod(self.cache.path, 0o600)
+        os.chmod(self.cache.directory, 0o777)
+        self.load()
+        self.assertFalse(self.cache.loaded)
+
+        os.chmod(self.cache.directory, 0o700)
+        self.load()
+        self.assertTrue(self.cache.loaded)
+
+    def test_for_root(self):
+        with patch.dict(
+                os.environ, {'XDG_CACHE_HOME': self.root}):
+            cache = ConfigCache.for_root(self.root)
+
+        self.assertEqual(
+            os.path.join(self.root, 'fosslint'),
+            os.path.dirname(cache.directory))
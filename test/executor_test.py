@@ -0,0 +1,42 @@
+from fosslint.executor import check_files
+from fosslint.executor import resolve_jobs
+from fosslint.stats import NullStats
+
+from unittest import TestCase
+from unittest.mock import Mock
+
+class ExecutorTest(TestCase):
+    def test_check_files_preserves_order(self):
+        context = Mock()
+        context.stats = NullStats()
+        opts = [Mock() for _ in range(10)]
+
+        for i, opt in enumerate(opts):
+            opt.check.return_value = [i]
+
+        for jobs in (1, 4):
+            results = list(check_files(context, opts, jobs, 'thread'))
+            self.assertEqual(opts, [opt for opt, _ in results])
+            self.assertEqual([[i] for i in range(10)],
+                             [records for _, records in results])
+
+    def test_check_files_lazy(self):
+        context = Mock()
+        context.stats = NullStats()
+
+        def opts():
+            opt = Mock()
+            opt.check.return_value = []
+            yield opt
+            raise Exception('should not be reached')
+
+        results = check_files(context, opts(), 1)
+        self.assertEqual([], next(results)[1])
+
+    def test_resolve_jobs(self):
+        self.assertEqual(1, resolve_jobs(None))
+        self.assertEqual(3, resolve_jobs(3))
+        self.assertTrue(resolve_jobs(0) >= 1)
+
+        with self.assertRaises(Exception):
+            resolve_jobs(-1)
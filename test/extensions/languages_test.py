@@ -0,0 +1,76 @@
+from fosslint.extensions import load_extension
+from fosslint.extensions import c_style
+from fosslint.extensions import generic
+from fosslint.extensions import python
+from fosslint.extensions import xml
+
+from unittest import TestCase
+from unittest.mock import Mock
+
+def options(**kw):
+    opt = Mock()
+    opt.language = kw.get('language', None)
+    opt.start_comment = None
+    opt.end_comment = None
+    opt.license_header_pad = None
+    opt.strip_license = False
+    return opt
+
+class LanguagesTest(TestCase):
+    def test_load_extension(self):
+        context = Mock()
+        context.extensions = dict()
+
+        ext = load_extension(context, '/a/b.py', options())
+        self.assertIsInstance(ext, python.Python)
+        self.assertIsInstance(
+            load_extension(context, '/a/b.go', options()), generic.Slash)
+        self.assertIsInstance(
+            load_extension(context, '/a/b.ts', options()), c_style.CStyle)
+        self.assertIsInstance(
+            load_extension(context, '/a/pom.xml', options()), xml.Xml)
+        self.assertIsInstance(
+            load_extension(context, '/a/Makefile', options()), generic.Hash)
+
+        # explicit language takes precedence.
+        self.assertIsInstance(
+            load_extension(context, '/a/b.py', options(language='hash')),
+            generic.Hash)
+
+        # instances are shared between files with the same options.
+        self.assertIs(ext, load_extension(context, '/c/d.py', options()))
+
+        with self.assertRaises(Exception):
+            load_extension(context, '/a/b.unknown', options())
+
+        with self.assertRaises(Exception):
+            load_extension(context, '/a/b.py', options(language='unknown'))
+
+    def test_slash_find_header_range(self):
+        ext = generic.Slash(Mock(), Mock(), options())
+
+        self.assertEqual((0, 2), ext.find_header_range([
+            '// Copyright',
+            '//',
+            'package main',
+        ]))
+
+        self.assertEqual((0, 0), ext.find_header_range([
+            'package main',
+        ]))
+
+    def test_xml_find_header_range(self):
+        ext = xml.Xml(Mock(), Mock(), options())
+
+        self.assertEqual((1, 4), ext.find_header_range([
+            '<?xml version="1.0"?>',
+            '<!--',
+            '  Copyright',
+            '-->',
+            '<project/>',
+        ]))
+
+        self.assertEqual((1, 1), ext.find_header_range([
+            '<?xml version="1.0"?>',
+            '<project/>',
+        ]))
@@ -29,3 +29,21 @@ class PythonTest(TestCase):
         self.assertEquals((0, 0), ext.find_header_range([
             'import sys'
         ]))
+
+    def test_find_header_range_stream(self):
+        context = Mock()
+        path = Mock()
+        opt = Mock()
+
+        ext = python.Python(context, path, opt)
+
+        lines = iter([
+            '#!foo',
+            '# DO NOT CARE',
+            'import sys',
+            'import os',
+        ])
+
+        self.assertEqual((1, 2), ext.find_header_range(lines))
+        # the stream is only consumed up until the end of the header.
+        self.assertEqual('import os', next(lines))
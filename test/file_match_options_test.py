@@ -0,0 +1,142 @@
+from fosslint.extensions import python
+from fosslint.file_match_options import CompiledOptions
+from fosslint.global_section import GlobalSection
+from fosslint.header_cache import RenderedHeader
+from fosslint.pattern_section import PatternSection
+from fosslint.pattern_section import parse_lines
+from fosslint.stats import NullStats
+from fosslint.utils import read_head
+from fosslint.utils import read_prefix
+
+import os
+import pickle
+import tempfile
+
+from unittest import TestCase
+from unittest.mock import Mock
+
+def compile_options(**kw):
+    global_section = GlobalSection(None)
+    global_section.max_file_size = None
+    return CompiledOptions(global_section, [PatternSection(None, **kw)])
+
+def mock_context(*expected):
+    context = Mock()
+    context.stats = NullStats()
+    context.render_header.return_value = RenderedHeader(expected)
+    context.read_head.side_effect = read_head
+    context.read_prefix.side_effect = read_prefix
+    return context
+
+class FileMatchOptionsTest(TestCase):
+    def test_compiled_options(self):
+        opt = compile_options(
+            start_comment='#', skip_header_lines=parse_lines('0,2-3'))
+
+        self.assertEqual('#', opt.start_comment)
+        self.assertEqual(0b1101, opt.skip_header_lines)
+        self.assertEqual([1, 0, 1, 1, 0], [opt.skipped(i) for i in range(5)])
+
+        with self.assertRaises(AttributeError):
+            opt.start_comment = '//'
+
+        # lines past the bitmap are still skipped.
+        opt = compile_options(skip_header_lines=parse_lines('1,4090-5000'))
+        self.assertEqual(
+            [True, True, True, False],
+            [bool(opt.skipped(i)) for i in (1, 4095, 5000, 5001)])
+        self.assertEqual(((4096, 5000),), opt.skip_header_ranges)
+
+        copy = pickle.loads(pickle.dumps(opt))
+        self.assertEqual(((4096, 5000),), copy.skip_header_ranges)
+
+    def test_stanza_past_expected_header(self):
+        context = mock_context('# Expected')
+
+        opt = compile_options(skip_header_on_stanza='Generated')
+        ext = python.Python(context, None, opt)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'a.py')
+
+            with open(path, 'w') as f:
+                for i in range(40):
+                    f.write('# Header line {}\n'.format(i))
+
+                f.write('# Generated\n')
+                f.write('import os\n')
+
+            records = list(opt.check_expect_line_header(
+                context, path, ext, Mock()))
+
+            self.assertEqual([], records)
+
+            opt = compile_options(skip_header_on_stanza='Missing')
+
+            records = list(opt.check_expect_line_header(
+                context, path, ext, Mock()))
+
+            self.assertEqual(1, len(records))
+
+    def test_match_header_bytes(self):
+        context = mock_context('# Copyright', '# Acme')
+        opt = compile_options()
+        ext = python.Python(context, None, opt)
+
+        cases = [
+            (b'# Copyright\n# Acme\nimport os\n', True),
+            (b'# Copyright\r\n# Acme\r\nimport os\r\n', True),
+            (b'#!/usr/bin/env python\n# Copyright\n# Acme\n', True),
+            (b'#!/usr/bin/env python\r\n# Copyright\r\n# Acme\r\n', True),
+            (b'# Copyright\r\n# Acme\n', False),
+            (b'# Copyright\n# Other\n', False),
+            (b'\n# Copyright\n# Acme\n', False),
+        ]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'a.py')
+
+            for content, expected in cases:
+                with open(path, 'wb') as f:
+                    f.write(content)
+
+                header = context.render_header.return_value
+                self.assertEqual(expected, opt.match_header_bytes(
+                    context, path, ext, header), content)
+
+                # the line level comparison agrees, except for mixed line ends
+                # which it accepts.
+                records = list(opt.check_expect_line_header(
+                    context, path, ext, Mock()))
+
+                if expected:
+                    self.assertEqual([], records)
+
+            # the line of a mismatch is found by comparing lines.
+            self.assertEqual(1, len(records))
+            self.assertEqual(0, records[0].line)
+
+    def test_shebang(self):
+        context = mock_context('# Copyright', '# Acme')
+        opt = compile_options()
+        ext = python.Python(context, None, opt)
+
+        cases = [
+            (b'#!/usr/bin/env python\n', 0),
+            (b'#!/usr/bin/env python\n\nimport os\n', 0),
+            (b'#!/usr/bin/env python\n# Copyright\n# Acme\n', 0),
+            (b'#!/usr/bin/env python\n# Copyright\n# Other\n', 1),
+            (b'import os\n', 1),
+        ]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'a.py')
+
+            for content, expected in cases:
+                with open(path, 'wb') as f:
+                    f.write(content)
+
+                records = list(opt.check_expect_line_header(
+                    context, path, ext, Mock()))
+
+                self.assertEqual(expected, len(records), content)
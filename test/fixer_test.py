@@ -0,0 +1,33 @@
+from fosslint.extensions import python
+from fosslint.fixer import rewrite_header
+
+import os
+import tempfile
+
+from unittest import TestCase
+from unittest.mock import Mock
+
+class FixerTest(TestCase):
+    def test_rewrite_header(self):
+        ext = python.Python(Mock(), Mock(), Mock())
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'a.py')
+
+            with open(path, 'wb') as f:
+                f.write(b'#!/bin/python\n# Old\n# Header\nimport os\r\n')
+
+            os.chmod(path, 0o751)
+
+            def render(lines, start_index):
+                self.assertEqual(1, start_index)
+                return ['# New\n']
+
+            rewrite_header(path, ext, render)
+
+            with open(path, 'rb') as f:
+                self.assertEqual(
+                    b'#!/bin/python\n# New\nimport os\r\n', f.read())
+
+            self.assertEqual(0o751, os.stat(path).st_mode & 0o7777)
+            self.assertEqual(['a.py'], os.listdir(tmp))
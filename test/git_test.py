@@ -0,0 +1,188 @@
+from fosslint.git import BlobReader
+from fosslint.git import ChangedWalker
+from fosslint.git import GitWalker
+from fosslint.git import UnsupportedIndex
+from fosslint.git import StagedWalker
+from fosslint.git import parse_index
+from fosslint.utils import SkippedFile
+
+import os
+import shutil
+import struct
+import subprocess
+import tempfile
+
+from unittest import TestCase
+from unittest import skipIf
+from unittest.mock import patch
+
+def entry(path, mode=0o100644, flags=0):
+    fixed = struct.pack(
+        '>10I20sH', 0, 0, 0, 0, 0, 0, mode, 0, 0, 0, b'\0' * 20,
+        flags | len(path))
+    data = fixed + path + b'\0'
+
+    while len(data) % 8 != 0:
+        data += b'\0'
+
+    return data
+
+def index(*entries):
+    data = b'DIRC' + struct.pack('>II', 2, len(entries))
+    return data + b''.join(entries) + b'\0' * 20
+
+class GitTest(TestCase):
+    def test_parse_index(self):
+        data = index(
+            entry(b'README.md'),
+            entry(b'src/a.py'),
+            # symlink
+            entry(b'src/link', mode=0o120000),
+            # submodule
+            entry(b'vendor/lib', mode=0o160000),
+            # conflict, stages 1 through 3
+            entry(b'x.py', flags=0x1000),
+            entry(b'x.py', flags=0x2000),
+            entry(b'x.py', flags=0x3000),
+        )
+
+        self.assertEqual(['README.md', 'src/a.py', 'x.py'], parse_index(data))
+
+    def test_parse_index_invalid(self):
+        with self.assertRaises(Exception):
+            parse_index(b'NOPE')
+
+def git(cwd, *args):
+    subprocess.run(
+        ['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com']
+        + list(args), cwd=cwd, check=True, capture_output=True)
+
+def write(root, path, content):
+    path = os.path.join(root, path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, 'w') as f:
+        f.write(content)
+
+@skipIf(shutil.which('git') is None, 'git is not installed')
+class GitWalkerTest(TestCase):
+    def test_walk(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            git(tmp, 'init', '-q')
+            write(tmp, 'a.py', 'tracked\n')
+            write(tmp, 'b.py', 'deleted\n')
+            os.symlink('a.py', os.path.join(tmp, 'link.py'))
+            git(tmp, 'add', '-A')
+            os.remove(os.path.join(tmp, 'b.py'))
+
+            expected = [
+                (os.path.join(tmp, 'a.py'), '/a.py'),
+                (os.path.join(tmp, 'b.py'), '/b.py'),
+            ]
+
+            self.assertEqual(expected, list(GitWalker(tmp).walk()))
+
+            # falling back to git ls-files lists the same files.
+            with patch('fosslint.git.read_index',
+                       side_effect=UnsupportedIndex('Not a git index')):
+                self.assertEqual(expected, list(GitWalker(tmp).walk()))
+
+@skipIf(shutil.which('git') is None, 'git is not installed')
+class ChangedWalkerTest(TestCase):
+    def test_walk(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            git(tmp, 'init', '-q')
+
+            for path in ['a.py', 'sub/b.py', 'sub/c.py', 'sub/d.py']:
+                write(tmp, path, 'original\n')
+
+            git(tmp, 'add', '-A')
+            git(tmp, 'commit', '-q', '-m', 'initial')
+
+            # modified, added, untracked and deleted
+            write(tmp, 'sub/b.py', 'modified\n')
+            write(tmp, 'sub/e.py', 'added\n')
+            git(tmp, 'add', 'sub/e.py')
+            write(tmp, 'sub/f.py', 'untracked\n')
+            git(tmp, 'rm', '-q', 'sub/c.py')
+            os.remove(os.path.join(tmp, 'sub/d.py'))
+
+            walker = ChangedWalker(tmp, 'HEAD')
+
+            self.assertEqual([
+                (os.path.join(tmp, 'sub/b.py'), '/sub/b.py'),
+                (os.path.join(tmp, 'sub/e.py'), '/sub/e.py'),
+                (os.path.join(tmp, 'sub/f.py'), '/sub/f.py'),
+            ], list(walker.walk()))
+            self.assertFalse(walker.complete)
+
+            # relative to a root which is a subdirectory of the worktree.
+            write(tmp, 'a.py', 'modified\n')
+            root = os.path.join(tmp, 'sub')
+            walker = ChangedWalker(root, 'HEAD')
+
+            self.assertEqual([
+                (os.path.join(root, 'b.py'), '/b.py'),
+                (os.path.join(root, 'e.py'), '/e.py'),
+                (os.path.join(root, 'f.py'), '/f.py'),
+            ], list(walker.walk()))
+
+@skipIf(shutil.which('git') is None, 'git is not installed')
+class StagedTest(TestCase):
+    def test_staged(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            git(tmp, 'init', '-q')
+            write(tmp, 'sub/a.py', 'committed\n')
+            write(tmp, 'sub/b.py', 'committed\n')
+            git(tmp, 'add', '-A')
+            git(tmp, 'commit', '-q', '-m', 'initial')
+
+            write(tmp, 'sub/a.py', 'staged\n')
+            git(tmp, 'add', 'sub/a.py')
+            write(tmp, 'sub/a.py', 'not staged\n')
+            write(tmp, 'sub/b.py', 'not staged\n')
+            write(tmp, 'sub/c.py', 'staged\n')
+            git(tmp, 'add', 'sub/c.py')
+            os.remove(os.path.join(tmp, 'sub/c.py'))
+
+            root = os.path.join(tmp, 'sub')
+            files = list(StagedWalker(root).walk())
+
+            self.assertEqual([
+                (os.path.join(root, 'a.py'), '/a.py'),
+                (os.path.join(root, 'c.py'), '/c.py'),
+            ], files)
+
+            reader = BlobReader(root)
+
+            try:
+                for path, _ in files:
+                    self.assertEqual(['staged\n'], reader.read_head(path, 10))
+
+                with self.assertRaises(OSError):
+                    reader.read(os.path.join(root, 'missing.py'))
+            finally:
+                reader.close()
+
+    def test_staged_too_large(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            git(tmp, 'init', '-q')
+            write(tmp, 'a.py', 'x' * 100 + '\n')
+            write(tmp, 'b.py', 'staged\n')
+            git(tmp, 'add', '-A')
+
+            reader = BlobReader(tmp)
+
+            try:
+                with self.assertRaises(SkippedFile):
+                    reader.read_prefix(os.path.join(tmp, 'a.py'), 10, 50)
+
+                path = os.path.join(tmp, 'b.py')
+                self.assertEqual(b'staged\n', reader.read_prefix(path, 10, 50))
+
+                # the blob is read once, while checking the same file.
+                write(tmp, 'b.py', 'changed\n')
+                git(tmp, 'add', '-A')
+                self.assertEqual(['staged\n'], reader.read_head(path, 10))
+            finally:
+                reader.close()
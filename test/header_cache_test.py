@@ -0,0 +1,31 @@
+from fosslint.header_cache import HeaderCache
+from fosslint.extensions import python
+from fosslint.licenses import LicenseText
+
+from unittest import TestCase
+from unittest.mock import Mock
+
+class HeaderCacheTest(TestCase):
+    def test_render(self):
+        context = Mock()
+        context.strip_lineend = lambda line: line.rstrip('\n')
+
+        opt = Mock()
+        opt.license_header_pad = None
+        opt.strip_license = False
+
+        ext = python.Python(context, Mock(), opt)
+        text = LicenseText(['Copyright {year} {entity}', ''])
+
+        cache = HeaderCache()
+        kw = {'year': '2016', 'entity': 'Acme'}
+
+        header = cache.render(ext, text, kw)
+        self.assertEqual(('# Copyright 2016 Acme', '# '), header.lines)
+        self.assertEqual(b'# Copyright 2016 Acme\n# \n', header.encoded)
+
+        self.assertIs(header, cache.render(ext, text, dict(kw)))
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+
+        cache.render(ext, text, {'year': '2017', 'entity': 'Acme'})
+        self.assertEqual((1, 2), (cache.hits, cache.misses))
@@ -0,0 +1,52 @@
+from fosslint.context import Context
+from fosslint.extensions import python
+from fosslint.header_cache import HeaderCache
+from fosslint.licenses import LicenseText
+
+from unittest import TestCase
+from unittest.mock import Mock
+
+class HeaderTrieTest(TestCase):
+    def setUp(self):
+        opt = Mock(license_header_pad=None, strip_license=False)
+        self.ext = python.Python(Context('/'), None, opt)
+
+        license_header = LicenseText(['Copyright {year} {entity}', 'Apache'])
+        accepted = (
+            ('old', LicenseText(['Copyright {year} Old Corp', 'Apache'])),
+            ('mit', LicenseText(['MIT', 'Copyright {year} {entity}'])),
+        )
+
+        self.trie = HeaderCache().trie(
+            self.ext, license_header, accepted,
+            {'year': '2016', 'entity': 'Acme'})
+
+    def test_classify(self):
+        trie = self.trie
+
+        self.assertEqual(
+            (True, 0, None),
+            trie.classify(['# Copyright 2016 Acme', '# Apache']))
+        self.assertEqual(
+            (True, 1, None),
+            trie.classify(['# Copyright 1999-2004 Old Corp', '# Apache']))
+        self.assertEqual(
+            (True, 2, None),
+            trie.classify(['# MIT', '# Copyright 2020 Someone', '# More']))
+
+        # the license header is rendered exactly.
+        self.assertEqual(
+            (False, 0, 0), trie.classify(['# Copyright 2017 Acme']))
+
+        # the closest variant matched the most lines.
+        self.assertEqual(
+            (False, 1, 1),
+            trie.classify(['# Copyright 2016 Old Corp', '# MIT']))
+        self.assertEqual('# Apache', trie.text(1, 1))
+        self.assertEqual('# Copyright {year} {entity}', trie.text(2, 1))
+
+    def test_skipped(self):
+        self.assertEqual(
+            (True, 0, None),
+            self.trie.classify(
+                ['# Copyright 2017 Acme', '# Apache'], lambda i: i == 0))
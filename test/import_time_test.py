@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+
+from unittest import TestCase
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# cumulative time budget for importing fosslint, in microseconds. Wall-clock
+# time depends on the host, so the default is generous enough for slow
+# machines, and a tighter budget can be set with FOSSLINT_IMPORT_BUDGET.
+IMPORT_BUDGET = 1000000
+
+# modules which are slow to import, and must only be imported when needed.
+DEFERRED = [
+    'pkg_resources',
+    'importlib.resources',
+    'difflib',
+    'tempfile',
+    'subprocess',
+    'concurrent.futures',
+    'ctypes',
+    'cProfile',
+    'fosslint.server',
+    'fosslint.watch',
+]
+
+def import_times():
+    """
+    Import fosslint in a fresh interpreter, and return the cumulative import
+    time of every module as reported by -X importtime.
+    """
+
+    env = dict(os.environ)
+    env['PYTHONPATH'] = ROOT
+    command = [sys.executable, '-X', 'importtime', '-c', 'import fosslint']
+
+    # warm up, so that compiling bytecode is not counted.
+    subprocess.run(command, env=env, check=True, capture_output=True)
+    result = subprocess.run(command, env=env, check=True, capture_output=True)
+
+    times = {}
+
+    for line in result.stderr.decode('utf-8').splitlines():
+        if not line.startswith('import time:'):
+            continue
+
+        parts = line[len('import time:'):].split('|')
+
+        try:
+            cumulative = int(parts[1])
+        except ValueError:
+            continue
+
+        times[parts[2].strip()] = cumulative
+
+    return times
+
+class ImportTimeTest(TestCase):
+    def test_import_time(self):
+        times = import_times()
+
+        for module in DEFERRED:
+            self.assertNotIn(module, times)
+
+    def test_import_budget(self):
+        budget = os.environ.get('FOSSLINT_IMPORT_BUDGET')
+        budget = int(budget) if budget else IMPORT_BUDGET
+        self.assertLess(import_times()['fosslint'], budget)
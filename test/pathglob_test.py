@@ -1,4 +1,7 @@
 from fosslint.pathglob import pathglob_compile
+from fosslint.pathglob import pathglob_covers
+from fosslint.pathglob import pathglob_rebase
+from fosslint.pathglob import PathGlobSet
 
 from unittest import TestCase
 
@@ -13,3 +16,39 @@ class GlobTest(TestCase):
         p = pathglob_compile('*.bin|*.baz')
         self.assertTrue(p('/hello/this/is/the/end.bin'))
         self.assertTrue(p('/hello/this/is/the/end.baz'))
+
+    def test_rebase(self):
+        p = pathglob_compile(pathglob_rebase('*.bin', '/sub'))
+        self.assertTrue(p('/sub/end.bin'))
+        self.assertTrue(p('/sub/is/the/end.bin'))
+        self.assertFalse(p('/other/end.bin'))
+
+        p = pathglob_compile(pathglob_rebase('/*/*.bin', '/sub'))
+        self.assertTrue(p('/sub/dir/end.bin'))
+        self.assertFalse(p('/dir/end.bin'))
+
+    def test_covers(self):
+        c = pathglob_covers('/node_modules/**')
+        self.assertTrue(c('/node_modules'))
+        self.assertFalse(c('/src/node_modules'))
+        self.assertFalse(c('/node_modules2'))
+
+        c = pathglob_covers('target/**|*.bin')
+        self.assertTrue(c('/target'))
+        self.assertTrue(c('/a/b/target'))
+        self.assertFalse(c('/a/b/target.bin'))
+
+        c = pathglob_covers('/**/*.bin')
+        self.assertFalse(c('/hello'))
+
+    def test_set(self):
+        s = PathGlobSet(['/**/*.py', '*.java', '/src/**', '*.py|*.bin'])
+
+        self.assertEqual([0, 2, 3], s.matches('/src/foo.py'))
+        self.assertEqual([1], s.matches('/lib/Foo.java'))
+        self.assertEqual([2], s.matches('/src/Makefile'))
+        self.assertEqual([3], s.matches('/lib/foo.bin'))
+        self.assertEqual([], s.matches('/lib/foo.c'))
+
+        self.assertTrue(s.any('/lib/foo.bin'))
+        self.assertFalse(s.any('/lib/foo.c'))
@@ -0,0 +1,51 @@
+from fosslint.project import load_project
+
+import io
+import os
+import tempfile
+
+from unittest import TestCase
+
+def write(root, path, content):
+    path = os.path.join(root, path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, 'w') as f:
+        f.write(content)
+
+class ProjectTest(TestCase):
+    def test_nested(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            write(tmp, '.fosslint', '[global]\nentity = Root\nyear = 2016\n'
+                  '[pattern:/**/*.py]\nlicense_header = Apache 2.0\n')
+            write(tmp, 'sub/.fosslint', '[global]\nentity = Sub\n'
+                  '[pattern:*.txt]\nlicense_header = Apache 2.0\n'
+                  '[ignore:/vendor/**]\n')
+
+            project = load_project(tmp, io.StringIO())
+
+            files = [
+                ('/src/a.py', '/src/a.py'),
+                ('/sub/b.py', '/sub/b.py'),
+                ('/sub/c.txt', '/sub/c.txt'),
+                ('/sub/deep/d.txt', '/sub/deep/d.txt'),
+                ('/sub/vendor/e.py', '/sub/vendor/e.py'),
+                ('/f.txt', '/f.txt'),
+            ]
+
+            opts = list(project.match_files(files))
+
+            self.assertEqual(
+                ['/src/a.py', '/sub/b.py', '/sub/c.txt', '/sub/deep/d.txt'],
+                [o.relative for o in opts])
+            self.assertEqual(
+                ['Root', 'Sub', 'Sub', 'Sub'],
+                [o.options.kw['entity'] for o in opts])
+            self.assertEqual(['2016'] * 4, [o.options.kw['year'] for o in opts])
+
+            # files matching the same sections share their options
+            self.assertIs(opts[2].options, opts[3].options)
+
+            # resolved once per directory
+            self.assertIs(project.resolve('/sub'), project.resolve('/sub/deep'))
+            self.assertIs(project, project.resolve('/src'))
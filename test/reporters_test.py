@@ -0,0 +1,71 @@
+from fosslint.reporters import Summary
+from fosslint.reporters import load_reporter
+from fosslint.violation import Violation
+
+import io
+import json
+
+from unittest import TestCase
+from unittest.mock import Mock
+
+def run(name, relative='/src/a.py', finish=True):
+    out = io.StringIO()
+    reporter = load_reporter(name, out)
+
+    opt = Mock()
+    opt.relative = relative
+
+    reporter.start()
+
+    for line in (0, 3):
+        reporter.violation(opt, Violation(
+            '/root' + relative, line, kind='Kind', message='Message',
+            expected='foo', actual='bar', offset=1))
+
+    if finish:
+        reporter.finish(Summary(2, 2, {'Kind': 2}, 0.5, True))
+
+    reporter.close()
+    return out.getvalue()
+
+class ReportersTest(TestCase):
+    def test_jsonl(self):
+        records = [json.loads(l) for l in run('jsonl').splitlines()]
+
+        self.assertEqual(3, len(records))
+        self.assertEqual('violation', records[0]['type'])
+        self.assertEqual(2, records[0]['file_line'])
+        self.assertEqual('foo', records[0]['expected'])
+        self.assertEqual('bar', records[0]['actual'])
+        self.assertEqual('summary', records[2]['type'])
+        self.assertEqual({'Kind': 2}, records[2]['by_kind'])
+
+    def test_sarif(self):
+        log = json.loads(run('sarif'))
+        results = log['runs'][0]['results']
+
+        self.assertEqual('2.1.0', log['version'])
+        self.assertEqual(2, len(results))
+        self.assertEqual('kind', results[0]['ruleId'])
+
+        location = results[1]['locations'][0]['physicalLocation']
+        self.assertEqual('src/a.py', location['artifactLocation']['uri'])
+        self.assertEqual(5, location['region']['startLine'])
+        self.assertTrue(
+            log['runs'][0]['invocations'][0]['executionSuccessful'])
+
+    def test_sarif_aborted(self):
+        log = json.loads(run('sarif', finish=False))
+        run_ = log['runs'][0]
+
+        self.assertEqual(2, len(run_['results']))
+        self.assertFalse(run_['invocations'][0]['executionSuccessful'])
+        self.assertFalse(run_['properties']['complete'])
+
+    def test_sarif_uri(self):
+        log = json.loads(run('sarif', '/src/a b#1%.py'))
+        location = log['runs'][0]['results'][0]['locations'][0]
+
+        self.assertEqual(
+            'src/a%20b%231%25.py',
+            location['physicalLocation']['artifactLocation']['uri'])
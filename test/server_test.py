@@ -0,0 +1,120 @@
+import io
+import json
+import os
+import socket
+import tempfile
+import threading
+
+from fosslint.client import check_remote
+from fosslint.cache import CACHE_DIR
+from fosslint.server import Server
+from fosslint.server import listen
+
+from unittest import TestCase
+from unittest.mock import Mock
+from unittest.mock import patch
+
+CONFIG = """[global]
+entity = Acme
+year = 2016
+
+[pattern:/**/*.py]
+license_header = Apache 2.0
+"""
+
+def setup_project(tmp):
+    with open(os.path.join(tmp, '.fosslint'), 'w') as f:
+        f.write(CONFIG)
+
+    os.mkdir(os.path.join(tmp, 'src'))
+
+    for name in ['a.py', 'b.py']:
+        with open(os.path.join(tmp, 'src', name), 'w') as f:
+            f.write('import os\n')
+
+    ns = Mock()
+    ns.root = tmp
+    ns.jobs = 1
+    ns.executor = 'thread'
+    ns.no_cache = True
+    ns.since = None
+    ns.source = 'walk'
+    ns.fail_fast = False
+    ns.max_violations = None
+    ns.socket = os.path.join(tmp, 'socket')
+    return ns
+
+class ServerTest(TestCase):
+    def test_save_when_idle(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            ns = setup_project(tmp)
+            ns.no_cache = False
+
+            server = Server(ns, io.StringIO())
+            server.check({}, io.StringIO())
+            server.check({'paths': [os.path.join(tmp, 'src', 'a.py')]},
+                         io.StringIO())
+
+            path = os.path.join(tmp, CACHE_DIR, 'cache.json')
+            self.assertFalse(os.path.exists(path))
+
+            server.save()
+            self.assertFalse(server.unsaved)
+
+            with open(path) as f:
+                self.assertEqual(2, len(json.load(f)['entries']))
+
+    def test_stalled_client(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            server = Server(setup_project(tmp), io.StringIO())
+            client, conn = socket.socketpair()
+
+            with client, conn, patch('fosslint.server.CLIENT_TIMEOUT', 0.1):
+                # the client never sends its request.
+                server.handle(conn)
+                response = json.loads(client.makefile('r').readline())
+
+            self.assertEqual('error', response['type'])
+
+    def test_check_remote(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            ns = setup_project(tmp)
+
+            log = io.StringIO()
+
+            # no server is running
+            self.assertIsNone(check_remote(ns, Mock(), log))
+
+            server = Server(ns, log)
+            sock = listen(ns.socket)
+
+            def serve():
+                for _ in range(2):
+                    conn, _ = sock.accept()
+
+                    with conn:
+                        server.handle(conn)
+
+            # a failed assertion must not leave the test waiting for
+            # requests which never arrive.
+            thread = threading.Thread(target=serve, daemon=True)
+            thread.start()
+
+            try:
+                reporter = Mock()
+                self.assertEqual(1, check_remote(ns, reporter, log))
+                self.assertEqual(2, reporter.violation.call_count)
+                summary = reporter.finish.call_args[0][0]
+                self.assertEqual(2, summary.checks)
+                self.assertTrue(summary.complete)
+
+                reporter = Mock()
+                paths = [os.path.join(tmp, 'src', 'b.py')]
+                self.assertEqual(1, check_remote(ns, reporter, log, paths))
+                opt, e = reporter.violation.call_args[0]
+                self.assertEqual('/src/b.py', opt.relative)
+                self.assertEqual(1, e.file_line)
+                self.assertFalse(reporter.finish.call_args[0][0].complete)
+            finally:
+                sock.close()
+                thread.join(5)
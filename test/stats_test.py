@@ -0,0 +1,52 @@
+from fosslint.stats import Stats
+
+from unittest import TestCase
+
+class StatsTest(TestCase):
+    def test_exclusive_phases(self):
+        stats = Stats()
+
+        def inner():
+            with stats.phase('inner'):
+                yield 1
+                yield 2
+
+        self.assertEqual([1, 2], list(stats.timed('outer', inner())))
+        self.assertEqual(set(['inner', 'outer']), set(stats.phases))
+
+    def test_slowest(self):
+        stats = Stats(slowest=2)
+
+        for name in ('a', 'b', 'c'):
+            with stats.file(name):
+                pass
+
+        self.assertEqual(2, len(stats.files))
+
+    def test_count(self):
+        stats = Stats()
+        stats.count('files')
+        stats.count('files', 2)
+        self.assertEqual({'files': 3}, stats.counters)
+
+    def test_merge_worker(self):
+        import pickle
+
+        stats = Stats()
+        worker = pickle.loads(pickle.dumps(stats))
+        self.assertIsNone(stats.snapshot())
+
+        with worker.phase('read'):
+            pass
+
+        worker.count('bytes read', 10)
+
+        with worker.file('a'):
+            pass
+
+        stats.merge(worker.snapshot())
+        self.assertEqual(set(['read']), set(stats.phases))
+        self.assertEqual({'bytes read': 10}, stats.counters)
+        self.assertEqual(1, len(stats.files))
+        # taken by the snapshot
+        self.assertEqual({}, worker.counters)
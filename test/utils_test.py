@@ -0,0 +1,53 @@
+from fosslint.utils import SkippedFile
+from fosslint.utils import parse_size
+from fosslint.utils import read_head
+
+import os
+import tempfile
+
+from unittest import TestCase
+
+class UtilsTest(TestCase):
+    def write(self, tmp, content):
+        path = os.path.join(tmp, 'file')
+
+        with open(path, 'wb') as f:
+            f.write(content)
+
+        return path
+
+    def test_read_head(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = self.write(tmp, u'# hé\r\n# b\nc\n'.encode('utf-8'))
+            self.assertEqual([u'# hé\r\n', u'# b\n'], read_head(path, 2))
+
+    def test_read_head_binary(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = self.write(tmp, b'\x89PNG\r\n\x1a\n\x00\x00')
+
+            with self.assertRaises(SkippedFile) as cm:
+                read_head(path, 10)
+
+            self.assertEqual('Binary File', cm.exception.kind)
+
+    def test_read_head_latin1(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = self.write(tmp, b'# Soci\xe9t\xe9\nimport os\n')
+            self.assertEqual(
+                [u'# Soci\ufffdt\ufffd\n', u'import os\n'],
+                read_head(path, 10))
+
+    def test_read_head_too_large(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = self.write(tmp, b'# header\n' * 10)
+
+            with self.assertRaises(SkippedFile) as cm:
+                read_head(path, 10, max_size=50)
+
+            self.assertEqual('File Too Large', cm.exception.kind)
+            self.assertEqual(1, len(read_head(path, 1, max_size=90)))
+
+    def test_parse_size(self):
+        self.assertEqual(100, parse_size('100'))
+        self.assertEqual(2048, parse_size('2k'))
+        self.assertEqual(3 * 1024 * 1024, parse_size('3M'))
@@ -0,0 +1,22 @@
+from fosslint.violation import Violation
+
+from unittest import TestCase
+from unittest.mock import Mock
+
+class ViolationTest(TestCase):
+    def test_slots(self):
+        e = Violation('/a.py', 1, kind='Kind', offset=2)
+        self.assertFalse(hasattr(e, '__dict__'))
+        self.assertEqual(4, e.file_line)
+        self.assertFalse(e.fixable)
+        self.assertEqual([], list(e.diff(Mock())))
+
+    def test_fix(self):
+        context = Mock()
+        options = Mock()
+        e = Violation('/a.py', 1, options=options)
+
+        self.assertTrue(e.fixable)
+        e.fix(context)
+        options.fix.assert_called_once_with(context, '/a.py')
+        self.assertEqual(options.diff.return_value, e.diff(context))
@@ -0,0 +1,54 @@
+from fosslint.pathglob import pathglob_covers
+from fosslint.walker import Walker
+
+import os
+import tempfile
+
+from unittest import TestCase
+
+class WalkerTest(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+
+        for d in ('src/sub', 'node_modules/pkg'):
+            os.makedirs(os.path.join(self.root, d))
+
+        for f in ('src/a.py', 'src/sub/b.py', 'node_modules/pkg/c.py'):
+            open(os.path.join(self.root, f), 'w').close()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_walk(self):
+        walker = Walker(self.root)
+        files = sorted(rel for _, rel in walker.walk())
+
+        self.assertEqual(
+            ['/node_modules/pkg/c.py', '/src/a.py', '/src/sub/b.py'], files)
+        self.assertEqual(5, walker.dirs)
+
+    def test_walk_sorted(self):
+        walker = Walker(self.root)
+        files = [rel for _, rel in walker.walk()]
+
+        self.assertEqual(
+            ['/node_modules/pkg/c.py', '/src/a.py', '/src/sub/b.py'], files)
+
+    def test_prune(self):
+        walker = Walker(self.root, [pathglob_covers('/node_modules/**')])
+        files = sorted(rel for _, rel in walker.walk())
+
+        self.assertEqual(['/src/a.py', '/src/sub/b.py'], files)
+        self.assertEqual(1, walker.pruned)
+
+    def test_symlink_loop(self):
+        os.symlink('..', os.path.join(self.root, 'src', 'up'))
+        os.symlink('src', os.path.join(self.root, 'linked'))
+
+        walker = Walker(self.root)
+        files = sorted(rel for _, rel in walker.walk())
+
+        self.assertEqual(
+            ['/node_modules/pkg/c.py', '/src/a.py', '/src/sub/b.py'], files)
+        self.assertEqual(2, walker.duplicates)
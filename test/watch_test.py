@@ -0,0 +1,58 @@
+import io
+import os
+import sys
+import tempfile
+
+from unittest import TestCase
+from unittest import skipUnless
+from unittest.mock import Mock
+
+CONFIG = """[global]
+entity = Acme
+year = 2016
+
+[pattern:/**/*.py]
+license_header = Apache 2.0
+"""
+
+@skipUnless(sys.platform.startswith('linux'), 'inotify is linux only')
+class WatchTest(TestCase):
+    def test_watch(self):
+        from fosslint.watch import Watch
+
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, '.fosslint'), 'w') as f:
+                f.write(CONFIG)
+
+            os.mkdir(os.path.join(tmp, 'src'))
+            path = os.path.join(tmp, 'src', 'a.py')
+
+            with open(path, 'w') as f:
+                f.write('import os\n')
+
+            ns = Mock()
+            ns.root = tmp
+            ns.jobs = 1
+            ns.executor = 'thread'
+            reporter = Mock()
+            watch = Watch(ns, reporter, io.StringIO())
+
+            try:
+                watch.load()
+                self.assertEqual(1, watch.check_all())
+                self.assertEqual(1, reporter.violation.call_count)
+                self.assertEqual(['/src/a.py'], list(watch.violations))
+
+                # a new file in a new directory
+                os.mkdir(os.path.join(tmp, 'lib'))
+
+                with open(os.path.join(tmp, 'lib', 'b.py'), 'w') as f:
+                    f.write('import sys\n')
+
+                os.remove(path)
+
+                self.assertEqual(1, watch.apply(watch.read_changes()))
+                self.assertEqual(2, reporter.violation.call_count)
+                self.assertEqual(['/lib/b.py'], list(watch.violations))
+            finally:
+                watch.inotify.close()